@@ -1,41 +1,95 @@
-from datetime import datetime
-from typing import List
+import base64
+import hashlib
+import hmac
+import json
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
-from sqlalchemy import and_, or_
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError
+from sqlalchemy import and_, exists, func, insert, or_
 from sqlalchemy.orm import Session
 
-from . import models, schemas
-from .auth import current_user, get_db, hash_pw, make_token, verify_pw
-from .calendar_ics import generate_ics
+from . import availability, events, metrics, models, reminders, schemas, search
+from .auth import (
+    SECRET_KEY,
+    current_user,
+    decode_token,
+    get_db,
+    get_sync_db,
+    hash_pw_async,
+    in_session,
+    make_token,
+    verify_and_update_pw_async,
+)
+from .cache import TTLCache
+from .calendar_ics import IcsEvent, generate_ics, iter_calendar
+from .db import conflict_insert
+from .graph import friend_graph
+from .middleware import etag_matches
 
 r = APIRouter(prefix="/api")
 
+
+def use_replica(db: Session = Depends(get_db)) -> None:
+    """Route dependency: this request only reads, replicas may serve it."""
+    db.info["read_only"] = True
+
+
+read_only = [Depends(use_replica)]
+
 # -------- Auth --------
 
 
+def _user_by_email(db: Session, email: str) -> Optional[models.User]:
+    return db.query(models.User).filter_by(email=email).first()
+
+
+# register/login are async: they await bcrypt in the hashing process pool
+# without holding a thread, and run their short DB steps in the threadpool.
 @r.post("/auth/register", response_model=schemas.TokenOut)
-def register(data: schemas.RegisterIn, db: Session = Depends(get_db)):
-    if db.query(models.User).filter_by(email=data.email).first():
+async def register(data: schemas.RegisterIn, db: Session = Depends(get_sync_db)):
+    if await run_in_threadpool(_user_by_email, db, data.email):
         raise HTTPException(400, "Email already used")
-    u = models.User(
-        email=data.email,
-        name=data.name,
-        password_hash=hash_pw(data.password),
-        timezone=data.timezone,
-    )
-    db.add(u)
-    db.commit()
-    db.refresh(u)
-    return {"access_token": make_token(u.id)}
+    password_hash = await hash_pw_async(data.password)
+
+    def create() -> int:
+        u = models.User(
+            email=data.email,
+            name=data.name,
+            password_hash=password_hash,
+            timezone=data.timezone,
+        )
+        db.add(u)
+        db.flush()
+        db.commit()
+        return u.id
+
+    return {"access_token": make_token(await run_in_threadpool(create))}
 
 
 @r.post("/auth/login", response_model=schemas.TokenOut)
-def login(data: schemas.LoginIn, db: Session = Depends(get_db)):
-    u = db.query(models.User).filter_by(email=data.email).first()
-    if not u or not verify_pw(data.password, u.password_hash):
+async def login(data: schemas.LoginIn, db: Session = Depends(get_sync_db)):
+    u = await run_in_threadpool(_user_by_email, db, data.email)
+    if not u:
         raise HTTPException(401, "Bad credentials")
-    return {"access_token": make_token(u.id)}
+    user_id = u.id
+    ok, new_hash = await verify_and_update_pw_async(data.password, u.password_hash)
+    if not ok:
+        raise HTTPException(401, "Bad credentials")
+    if new_hash:
+        # transparent upgrade, e.g. old bcrypt -> bcrypt_sha256
+        u.password_hash = new_hash
+        await run_in_threadpool(db.commit)
+    return {"access_token": make_token(user_id)}
 
 
 @r.get("/me", response_model=schemas.UserOut)
@@ -47,6 +101,7 @@ def me(user: models.User = Depends(current_user)):
 
 
 @r.post("/friends/{friend_id}/request")
+@in_session
 def request_friend(
     friend_id: int,
     user: models.User = Depends(current_user),
@@ -54,136 +109,314 @@ def request_friend(
 ):
     if friend_id == user.id:
         raise HTTPException(400, "Cannot add self")
-    for a, b in [(user.id, friend_id), (friend_id, user.id)]:
-        if not db.query(models.Friendship).filter_by(user_id=a, friend_id=b).first():
-            db.add(
-                models.Friendship(
-                    user_id=a,
-                    friend_id=b,
-                    status=models.FriendshipStatus.pending,
-                )
-            )
+    low, high = models.Friendship.pair(user.id, friend_id)
+    values = dict(
+        low_id=low,
+        high_id=high,
+        requester_id=user.id,
+        status=models.FriendshipStatus.pending,
+    )
+    # existing pair (pending or accepted) is left alone
+    stmt = conflict_insert(db, models.Friendship)
+    if stmt is not None:
+        created = db.execute(stmt.values(**values).on_conflict_do_nothing()).rowcount
+    else:
+        created = not db.get(models.Friendship, (low, high))
+        if created:
+            db.add(models.Friendship(**values))
     db.commit()
+
+    if created:
+        friend_graph.set_edge(
+            user.id, friend_id, models.FriendshipStatus.pending, user.id
+        )
+        events.publish(friend_id, "friend.requested", user_id=user.id)
     return {"ok": True}
 
 
-@r.get("/friends/requests/incoming", response_model=List[schemas.UserOut])
+@r.get(
+    "/friends/requests/incoming",
+    response_model=List[schemas.UserOut],
+    dependencies=read_only,
+)
+@in_session
 def incoming_requests(
     user: models.User = Depends(current_user),
     db: Session = Depends(get_db),
 ):
-    rows = (
-        db.query(models.Friendship)
-        .filter_by(friend_id=user.id, status=models.FriendshipStatus.pending)
-        .all()
-    )
-    ids = [r.user_id for r in rows]
+    ids = friend_graph.incoming(db, user.id)
     return db.query(models.User).filter(models.User.id.in_(ids)).all() if ids else []
 
 
 @r.post("/friends/{friend_id}/approve")
+@in_session
 def approve_friend(
     friend_id: int,
     user: models.User = Depends(current_user),
     db: Session = Depends(get_db),
 ):
-    for a, b in [(user.id, friend_id), (friend_id, user.id)]:
-        fr = db.query(models.Friendship).filter_by(user_id=a, friend_id=b).first()
-        if fr:
-            fr.status = models.FriendshipStatus.accepted
-        else:
-            db.add(
-                models.Friendship(
-                    user_id=a,
-                    friend_id=b,
-                    status=models.FriendshipStatus.accepted,
-                )
+    if friend_id == user.id:
+        raise HTTPException(400, "Cannot add self")
+    low, high = models.Friendship.pair(user.id, friend_id)
+    accepted = models.FriendshipStatus.accepted
+    stmt = conflict_insert(db, models.Friendship)
+    if stmt is not None:
+        requester_id = db.execute(
+            stmt.values(
+                low_id=low, high_id=high, requester_id=friend_id, status=accepted
             )
+            .on_conflict_do_update(
+                index_elements=["low_id", "high_id"], set_={"status": accepted}
+            )
+            .returning(models.Friendship.requester_id)
+        ).scalar_one()
+    else:
+        fr = db.get(models.Friendship, (low, high))
+        if not fr:
+            fr = models.Friendship(low_id=low, high_id=high, requester_id=friend_id)
+            db.add(fr)
+        fr.status = accepted
+        requester_id = fr.requester_id
     db.commit()
+
+    friend_graph.set_edge(user.id, friend_id, accepted, requester_id)
     return {"ok": True}
 
 
+def _delete_friendship(db: Session, a: int, b: int) -> None:
+    low, high = models.Friendship.pair(a, b)
+    db.query(models.Friendship).filter_by(low_id=low, high_id=high).delete(
+        synchronize_session=False
+    )
+
+
 @r.post("/friends/{friend_id}/decline")
+@in_session
 def decline_friend(
     friend_id: int,
     user: models.User = Depends(current_user),
     db: Session = Depends(get_db),
 ):
-    db.query(models.Friendship).filter(
-        (
-            (models.Friendship.user_id == user.id)
-            & (models.Friendship.friend_id == friend_id)
-        )
-        | (
-            (models.Friendship.user_id == friend_id)
-            & (models.Friendship.friend_id == user.id)
-        )
-    ).delete(synchronize_session=False)
+    _delete_friendship(db, user.id, friend_id)
     db.commit()
+    friend_graph.remove_pair(user.id, friend_id)
     return {"ok": True}
 
 
-@r.get("/friends", response_model=List[schemas.UserOut])
+@r.get("/friends", response_model=List[schemas.UserOut], dependencies=read_only)
+@in_session
 def friends(
     user: models.User = Depends(current_user),
     db: Session = Depends(get_db),
 ):
-    ids = [
-        f.friend_id
-        for f in db.query(models.Friendship).filter_by(
-            user_id=user.id, status=models.FriendshipStatus.accepted
-        )
-    ]
-    ids += [
-        f.user_id
-        for f in db.query(models.Friendship).filter_by(
-            friend_id=user.id, status=models.FriendshipStatus.accepted
+    ids = friend_graph.friends(db, user.id)
+    return db.query(models.User).filter(models.User.id.in_(ids)).all() if ids else []
+
+
+@r.get(
+    "/friends/suggestions",
+    response_model=List[schemas.FriendSuggestionOut],
+    dependencies=read_only,
+)
+@in_session
+def friend_suggestions(
+    limit: int = Query(20, ge=1, le=100),
+    user: models.User = Depends(current_user),
+    db: Session = Depends(get_db),
+):
+    """People I am not connected with, by number of mutual friends."""
+    ranked = friend_graph.suggestions(db, user.id, limit)
+    if not ranked:
+        return []
+    users = {
+        u.id: u
+        for u in db.query(models.User).filter(
+            models.User.id.in_([uid for uid, _ in ranked])
         )
+    }
+    return [
+        {"user": users[uid], "mutual_count": n} for uid, n in ranked if uid in users
     ]
-    return db.query(models.User).filter(models.User.id.in_(ids)).all() if ids else []
 
 
 # -------- Aura helper (used by aura/ping endpoints) --------
 
 
-def aura_out(p: models.Ping, db: Session) -> schemas.PingOut:
-    # creator
-    creator = db.get(models.User, p.creator_id)
+class FastJSONResponse(ORJSONResponse):
+    """orjson-encoded JSON for pre-built payloads (no response_model pass).
+
+    OPT_UTC_Z writes aware UTC datetimes with "Z", like Pydantic does.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def auras_out(
+    pings: List[models.Ping], db: Session, invite_model=models.PingInvite
+) -> List[dict]:
+    """Serialize many auras with a fixed number of queries (invites + users).
+
+    Returns PingOut-shaped dicts, ready for FastJSONResponse. Every user is
+    validated through UserOut once; the aura fields come straight from typed
+    columns, so the result is not validated a second time on the way out.
+    """
+    if not pings:
+        return []
+
+    # invites for all auras in one go
+    invites_by_ping = {p.id: [] for p in pings}
+    for inv in (
+        db.query(invite_model)
+        .filter(invite_model.ping_id.in_(invites_by_ping.keys()))
+        .order_by(invite_model.id)
+    ):
+        invites_by_ping[inv.ping_id].append(inv)
+
+    # creators + invitees in one users query
+    user_ids = {p.creator_id for p in pings}
+    for invites in invites_by_ping.values():
+        user_ids.update(i.invitee_id for i in invites)
+    users = {
+        u.id: schemas.UserOut.model_validate(u).model_dump()
+        for u in db.query(models.User).filter(models.User.id.in_(user_ids))
+    }
 
-    # invites
-    invites = db.query(models.PingInvite).filter_by(ping_id=p.id).all()
-    user_ids = [i.invitee_id for i in invites]
-    users = (
+    return [
         {
-            u.id: u
-            for u in db.query(models.User).filter(models.User.id.in_(user_ids)).all()
+            "id": p.id,
+            "title": p.title,
+            "starts_at": p.starts_at,
+            "location": p.location,
+            "notes": p.notes,
+            "creator": users[p.creator_id],
+            "invites": [
+                {"user": users[i.invitee_id], "status": i.status.value}
+                for i in invites_by_ping[p.id]
+            ],
+            "ics_public_url": f"/api/pings/{p.id}/ics-public?sig={p.ics_secret}",
+            "version": p.version,
+            # NEW: activity fields
+            "activity_type": p.activity_type,
+            "activity_custom_label": p.activity_custom_label,
+            "activity_label": p.activity_label,
         }
-        if user_ids
-        else {}
-    )
+        for p in pings
+    ]
+
+
+def aura_out(p: models.Ping, db: Session) -> dict:
+    if isinstance(p, models.ArchivedPing):
+        return auras_out([p], db, invite_model=models.ArchivedPingInvite)[0]
+    return auras_out([p], db)[0]
+
+
+def find_ping(db: Session, ping_id: int):
+    """Ping by id, falling back to the archive (see jobs.archive_old_auras)."""
+    return db.get(models.Ping, ping_id) or db.get(models.ArchivedPing, ping_id)
+
+
+def bump(row) -> None:
+    """Mark a Ping/PingInvite as changed so it shows up in /pings/changes."""
+    row.version = (row.version or 0) + 1
+    row.updated_at = datetime.utcnow()
+
+
+def screen_invitees(
+    db: Session, user: models.User, invitee_ids: List[int]
+) -> Tuple[List[int], Dict[int, str]]:
+    """Split requested invitees into accepted friends and rejections.
+
+    Returns (valid ids in request order, {id: "self" | "not_friend"}).
+    """
+    my_friend_ids = friend_graph.friends(db, user.id)  # accepted friends only
+    unknown = [i for i in invitee_ids if i != user.id and i not in my_friend_ids]
+    if unknown:
+        # the cache may predate an approval made on another worker
+        my_friend_ids |= friend_graph.confirm_friends(db, user.id, set(unknown))
+    valid, rejected = [], {}
+    for i in dict.fromkeys(invitee_ids):
+        if i == user.id:
+            rejected[i] = "self"
+        elif i not in my_friend_ids:
+            rejected[i] = "not_friend"
+        else:
+            valid.append(i)
+    return valid, rejected
 
-    ics_url = f"/api/pings/{p.id}/ics-public?sig={p.ics_secret}"
 
-    return schemas.PingOut(
-        id=p.id,
-        title=p.title,
-        starts_at=p.starts_at,
-        location=p.location,
-        notes=p.notes,
-        creator=schemas.UserOut.model_validate(creator),
-        invites=[
+def apply_rsvps(
+    db: Session, user: models.User, statuses: Dict[int, str]
+) -> Dict[int, int]:
+    """Set my RSVP on many auras with set-based UPDATEs in one transaction.
+
+    Returns {ping_id: creator_id} for the auras I actually was invited to.
+    """
+    if not statuses:
+        return {}
+    rows = (
+        db.query(
+            models.PingInvite.ping_id, models.Ping.creator_id, models.Ping.starts_at
+        )
+        .join(models.Ping, models.Ping.id == models.PingInvite.ping_id)
+        .filter(
+            models.PingInvite.invitee_id == user.id,
+            models.PingInvite.ping_id.in_(statuses.keys()),
+        )
+        .all()
+    )
+    if not rows:
+        return {}
+    found = {ping_id: creator_id for ping_id, creator_id, _ in rows}
+
+    now = datetime.utcnow()
+    by_status = defaultdict(list)
+    for ping_id in found:
+        by_status[statuses[ping_id]].append(ping_id)
+    for st, ping_ids in by_status.items():
+        db.query(models.PingInvite).filter(
+            models.PingInvite.invitee_id == user.id,
+            models.PingInvite.ping_id.in_(ping_ids),
+        ).update(
             {
-                "user": schemas.UserOut.model_validate(users[i.invitee_id]),
-                "status": i.status.value,
-            }
-            for i in invites
+                models.PingInvite.status: models.InviteStatus(st),
+                models.PingInvite.responded_at: now,
+                models.PingInvite.updated_at: now,
+                models.PingInvite.version: models.PingInvite.version + 1,
+            },
+            synchronize_session=False,
+        )
+    db.query(models.Ping).filter(models.Ping.id.in_(found.keys())).update(
+        {models.Ping.updated_at: now, models.Ping.version: models.Ping.version + 1},
+        synchronize_session=False,
+    )
+    declined = by_status.get(models.InviteStatus.declined.value, [])
+    if declined:
+        reminders.cancel(db, user.id, declined)
+    reminders.schedule(
+        db,
+        [
+            (ping_id, starts_at, user.id)
+            for ping_id, _, starts_at in rows
+            if statuses[ping_id] != models.InviteStatus.declined.value
         ],
-        ics_public_url=ics_url,
-        # NEW: activity fields
-        activity_type=p.activity_type,
-        activity_custom_label=p.activity_custom_label,
-        activity_label=p.activity_label,
+        now=now,
     )
+    db.commit()
+    for ping_id in found:
+        ics_cache.pop(ping_id)
+    for st, ping_ids in by_status.items():
+        metrics.RSVPS.labels(st).inc(len(ping_ids))
+
+    for ping_id, creator_id in found.items():
+        events.publish(
+            creator_id,
+            "rsvp.changed",
+            ping_id=ping_id,
+            user_id=user.id,
+            status=statuses[ping_id],
+        )
+    return found
 
 
 # -------- “Pings” (Auras) API --------
@@ -191,6 +424,7 @@ def aura_out(p: models.Ping, db: Session) -> schemas.PingOut:
 
 
 @r.post("/pings", response_model=schemas.PingOut, status_code=status.HTTP_201_CREATED)
+@in_session
 def create_ping(
     data: schemas.PingCreate,
     user: models.User = Depends(current_user),
@@ -199,24 +433,10 @@ def create_ping(
     if not data.invitee_ids:
         raise HTTPException(400, "At least one invitee is required")
 
-    # accepted friends only
-    my_friend_ids = set()
-    for fr in db.query(models.Friendship).filter_by(
-        user_id=user.id, status=models.FriendshipStatus.accepted
-    ):
-        my_friend_ids.add(fr.friend_id)
-    for fr in db.query(models.Friendship).filter_by(
-        friend_id=user.id, status=models.FriendshipStatus.accepted
-    ):
-        my_friend_ids.add(fr.user_id)
-
-    clean_invitees = []
-    for i in set(data.invitee_ids):
-        if i == user.id:
-            continue
-        if i not in my_friend_ids:
+    clean_invitees, rejected = screen_invitees(db, user, data.invitee_ids)
+    for i, reason in rejected.items():
+        if reason == "not_friend":
             raise HTTPException(400, f"Invitee {i} is not your accepted friend")
-        clean_invitees.append(i)
 
     if not clean_invitees:
         raise HTTPException(400, "No valid invitees after filtering")
@@ -225,127 +445,584 @@ def create_ping(
     p = models.Ping(
         creator_id=user.id,
         title=data.title,
-        starts_at=data.starts_at,
+        # stored naive UTC, so the 201 echoes what later reads return
+        starts_at=availability.naive_utc(data.starts_at),
         location=data.location,
         notes=(data.notes or "").strip(),
         activity_type=data.activity_type,
         activity_custom_label=data.activity_custom_label,
     )
     db.add(p)
+    db.flush()
+    db.execute(
+        insert(models.PingInvite),
+        [{"ping_id": p.id, "invitee_id": i} for i in clean_invitees],
+    )
+    reminders.schedule(
+        db, [(p.id, p.starts_at, uid) for uid in [user.id, *clean_invitees]]
+    )
     db.commit()
-    db.refresh(p)
+    metrics.INVITES_CREATED.inc(len(clean_invitees))
 
     for invitee_id in clean_invitees:
-        db.add(models.PingInvite(ping_id=p.id, invitee_id=invitee_id))
-    db.commit()
+        events.publish(invitee_id, "invite.created", ping_id=p.id, title=p.title)
 
-    return aura_out(p, db)
+    return FastJSONResponse(aura_out(p, db), status_code=status.HTTP_201_CREATED)
 
 
-@r.get("/pings/inbox", response_model=List[schemas.PingOut])
-def inbox(
+@r.post(
+    "/pings/suggest-times",
+    response_model=schemas.SuggestTimesOut,
+    dependencies=read_only,
+)
+@in_session
+def suggest_times(
+    data: schemas.SuggestTimesIn,
     user: models.User = Depends(current_user),
     db: Session = Depends(get_db),
 ):
-    my_creations = db.query(models.Ping).filter_by(creator_id=user.id)
-    my_invites = (
-        db.query(models.Ping)
-        .join(models.PingInvite, models.Ping.id == models.PingInvite.ping_id)
-        .filter(
-            models.PingInvite.invitee_id == user.id,
-            models.PingInvite.status != models.InviteStatus.declined,
+    """Rank start times in the window by how many participants are free."""
+    clean_invitees, rejected = screen_invitees(db, user, data.invitee_ids)
+    for i, reason in rejected.items():
+        if reason == "not_friend":
+            raise HTTPException(400, f"Invitee {i} is not your accepted friend")
+    if not clean_invitees:
+        raise HTTPException(400, "No valid invitees after filtering")
+
+    start = max(
+        availability.naive_utc(data.window_start),
+        datetime.utcnow().replace(second=0, microsecond=0),
+    )
+    end = availability.naive_utc(data.window_end)
+    if end - start > availability.SUGGEST_MAX_WINDOW:
+        raise HTTPException(
+            400,
+            f"Window too long (max {availability.SUGGEST_MAX_WINDOW.days} days)",
         )
+
+    participants = [user] + (
+        db.query(models.User).filter(models.User.id.in_(clean_invitees)).all()
+    )
+    duration = timedelta(minutes=data.duration_minutes)
+    slots = availability.suggest_times(
+        db,
+        participants,
+        start,
+        end,
+        duration,
+        timedelta(minutes=data.step_minutes),
+        data.limit,
+        data.day_start_hour,
+        data.day_end_hour,
+    )
+    everybody = [u.id for u in participants]
+    return {
+        "participants": len(everybody),
+        "slots": [
+            {
+                "starts_at": s.starts_at.replace(tzinfo=timezone.utc),
+                "ends_at": (s.starts_at + duration).replace(tzinfo=timezone.utc),
+                "available_ids": [i for i in everybody if i not in s.busy_ids],
+                "busy_ids": [i for i in everybody if i in s.busy_ids],
+            }
+            for s in slots
+        ],
+    }
+
+
+INBOX_PAGE_SIZE = int(os.getenv("INBOX_PAGE_SIZE", "100"))
+
+
+def encode_cursor(starts_at: datetime, ping_id: int) -> str:
+    raw = f"{starts_at.isoformat()}|{ping_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, ping_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(ping_id)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+
+
+@r.get("/pings/inbox", response_model=List[schemas.PingOut], dependencies=read_only)
+@in_session
+def inbox(
+    window: Literal["all", "upcoming", "past"] = "all",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    user: models.User = Depends(current_user),
+    db: Session = Depends(get_db),
+):
+    """Auras I created or am invited to (not declined).
+
+    Sorted by (starts_at, id); "past" is newest first. Without `limit` and
+    `cursor` everything is returned, as older clients expect. Otherwise the
+    result is keyset-paginated (INBOX_PAGE_SIZE by default) and the cursor
+    for the next page is sent in the X-Next-Cursor header.
+    """
+    invited = exists().where(
+        models.PingInvite.ping_id == models.Ping.id,
+        models.PingInvite.invitee_id == user.id,
+        models.PingInvite.status != models.InviteStatus.declined,
     )
+    q = db.query(models.Ping).filter(or_(models.Ping.creator_id == user.id, invited))
+
+    now = datetime.utcnow()
+    if window == "upcoming":
+        # upcoming auras are never closed yet; the filter lets the planner
+        # use the partial index ix_auras_open_starts
+        q = q.filter(models.AURA_IS_OPEN, models.Ping.starts_at >= now)
+    elif window == "past":
+        q = q.filter(models.Ping.starts_at < now)
+
+    desc = window == "past"
+    if cursor:
+        ts, last_id = decode_cursor(cursor)
+        if desc:
+            after = or_(
+                models.Ping.starts_at < ts,
+                and_(models.Ping.starts_at == ts, models.Ping.id < last_id),
+            )
+        else:
+            after = or_(
+                models.Ping.starts_at > ts,
+                and_(models.Ping.starts_at == ts, models.Ping.id > last_id),
+            )
+        q = q.filter(after)
+
+    if desc:
+        q = q.order_by(models.Ping.starts_at.desc(), models.Ping.id.desc())
+    else:
+        q = q.order_by(models.Ping.starts_at.asc(), models.Ping.id.asc())
+
+    if limit is None and cursor is None:
+        return FastJSONResponse(auras_out(q.all(), db))
+    limit = limit or INBOX_PAGE_SIZE
+    rows = q.limit(limit + 1).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].starts_at, rows[-1].id)
+    return FastJSONResponse(auras_out(rows, db), headers=headers)
+
+
+# A change's updated_at is taken before its transaction commits, so a poll can
+# see a later change first. The final cursor of a poll therefore never passes
+# the poll's own clock minus this much, and the next poll re-sends changes in
+# that window; clients skip what they already have by (id, version). Must
+# exceed the longest write transaction.
+CHANGES_OVERLAP = timedelta(seconds=float(os.getenv("CHANGES_OVERLAP_SECONDS", "30")))
+
 
-    ids = {p.id for p in my_creations.all()} | {p.id for p in my_invites.all()}
+@r.get("/pings/changes", response_model=schemas.PingChangesOut, dependencies=read_only)
+@in_session
+def ping_changes(
+    since: Optional[str] = None,
+    limit: int = Query(200, ge=1, le=500),
+    user: models.User = Depends(current_user),
+    db: Session = Depends(get_db),
+):
+    """Auras changed after `since` (a cursor from a previous call).
+
+    Auras the user has since declined come back as ids in `removed`. Without
+    `since` this returns everything, i.e. a full sync. Pages of one poll
+    (has_more) continue exactly; the last page's cursor stays CHANGES_OVERLAP
+    behind the poll's clock, so auras changed just before it may come back
+    with a version already seen. Once they are older, polls come back empty.
+    """
+    settled = (datetime.utcnow() - CHANGES_OVERLAP, 0)
+    invited = exists().where(
+        models.PingInvite.ping_id == models.Ping.id,
+        models.PingInvite.invitee_id == user.id,
+    )
+    q = db.query(models.Ping).filter(or_(models.Ping.creator_id == user.id, invited))
+    start = decode_cursor(since) if since else None
+    if start:
+        ts, last_id = start
+        q = q.filter(
+            or_(
+                models.Ping.updated_at > ts,
+                and_(models.Ping.updated_at == ts, models.Ping.id > last_id),
+            )
+        )
     rows = (
-        db.query(models.Ping)
-        .filter(models.Ping.id.in_(ids))
-        .order_by(models.Ping.starts_at.asc())
+        q.order_by(models.Ping.updated_at.asc(), models.Ping.id.asc())
+        .limit(limit + 1)
         .all()
-        if ids
-        else []
     )
-    return [aura_out(p, db) for p in rows]
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    declined = set()
+    if rows:
+        declined = {
+            pid
+            for (pid,) in db.query(models.PingInvite.ping_id).filter(
+                models.PingInvite.ping_id.in_([p.id for p in rows]),
+                models.PingInvite.invitee_id == user.id,
+                models.PingInvite.status == models.InviteStatus.declined,
+            )
+        }
+        last = (rows[-1].updated_at, rows[-1].id)
+        if not has_more:
+            # not past what may still be committing, never back behind `since`
+            last = min(last, settled)
+            if start:
+                last = max(last, start)
+        next_cursor = encode_cursor(*last)
+    else:
+        next_cursor = since or ""
+
+    return FastJSONResponse(
+        {
+            "changed": auras_out([p for p in rows if p.id not in declined], db),
+            "removed": sorted(declined),
+            "cursor": next_cursor,
+            "has_more": has_more,
+        }
+    )
 
 
-@r.get("/pings/{ping_id}", response_model=schemas.PingOut)
+@r.get("/pings/{ping_id}", response_model=schemas.PingOut, dependencies=read_only)
+@in_session
 def get_ping(
     ping_id: int,
     user: models.User = Depends(current_user),
     db: Session = Depends(get_db),
 ):
-    p = db.get(models.Ping, ping_id)
+    p = find_ping(db, ping_id)
     if not p:
         raise HTTPException(404)
-    return aura_out(p, db)
+    return FastJSONResponse(aura_out(p, db))
 
 
 @r.post("/pings/{ping_id}/respond")
+@in_session
 def respond(
     ping_id: int,
     data: schemas.RespondIn,
     user: models.User = Depends(current_user),
     db: Session = Depends(get_db),
 ):
-    inv = (
-        db.query(models.PingInvite)
-        .filter_by(ping_id=ping_id, invitee_id=user.id)
-        .first()
-    )
-    if not inv:
+    if not apply_rsvps(db, user, {ping_id: data.status}):
         raise HTTPException(404, "No invite found")
-    inv.status = models.InviteStatus(data.status)
-    inv.responded_at = datetime.utcnow()
-    db.commit()
     return {"ok": True}
 
 
-@r.get("/pings/{ping_id}/ics-public")
-def ics_public(
+@r.post("/pings/respond:batch", response_model=schemas.RespondBatchOut)
+@in_session
+def respond_batch(
+    data: schemas.RespondBatchIn,
+    user: models.User = Depends(current_user),
+    db: Session = Depends(get_db),
+):
+    """RSVP to many auras at once (e.g. "mark all as maybe"); last one wins."""
+    statuses = {item.ping_id: item.status for item in data.items}
+    found = apply_rsvps(db, user, statuses)
+    return {
+        "results": [
+            {
+                "ping_id": i,
+                "ok": i in found,
+                "error": None if i in found else "no_invite",
+            }
+            for i in statuses
+        ]
+    }
+
+
+@r.post("/pings/{ping_id}/invitees", response_model=schemas.InviteesOut)
+@in_session
+def add_invitees(
     ping_id: int,
-    sig: str,
+    data: schemas.InviteesIn,
+    user: models.User = Depends(current_user),
     db: Session = Depends(get_db),
 ):
     p = db.get(models.Ping, ping_id)
-    if not p or sig != p.ics_secret:
+    if not p:
         raise HTTPException(404)
+    if p.creator_id != user.id:
+        raise HTTPException(403, "Only the creator can invite people")
 
+    valid, rejected = screen_invitees(db, user, data.invitee_ids)
+    if valid:
+        existing = {
+            i
+            for (i,) in db.query(models.PingInvite.invitee_id).filter(
+                models.PingInvite.ping_id == p.id,
+                models.PingInvite.invitee_id.in_(valid),
+            )
+        }
+        rejected.update({i: "already_invited" for i in existing})
+    added = [i for i in valid if i not in rejected]
+
+    if added:
+        rows = [{"ping_id": p.id, "invitee_id": i} for i in added]
+        stmt = conflict_insert(db, models.PingInvite)
+        if stmt is not None:
+            # a concurrent request may have invited the same person
+            stmt = stmt.on_conflict_do_nothing(index_elements=["ping_id", "invitee_id"])
+        else:
+            stmt = insert(models.PingInvite)
+        db.execute(stmt, rows)
+        reminders.schedule(db, [(p.id, p.starts_at, uid) for uid in added])
+        bump(p)
+        db.commit()
+        ics_cache.pop(p.id)
+        metrics.INVITES_CREATED.inc(len(added))
+        for invitee_id in added:
+            events.publish(invitee_id, "invite.created", ping_id=p.id, title=p.title)
+
+    return {
+        "results": [
+            {"user_id": i, "ok": i not in rejected, "error": rejected.get(i)}
+            for i in dict.fromkeys(data.invitee_ids)
+        ]
+    }
+
+
+# -------- Calendar (ICS) --------
+
+ICS_CACHE_SIZE = int(os.getenv("ICS_CACHE_SIZE", "10000"))
+ICS_CACHE_TTL = float(os.getenv("ICS_CACHE_TTL", "300"))
+
+
+@dataclass(frozen=True)
+class IcsEntry:
+    version: int
+    secret: str
+    etag: str
+    last_modified: str
+    body: str
+
+
+# ping_id -> IcsEntry; dropped when the aura changes, TTL bounds other workers
+ics_cache = TTLCache(ICS_CACHE_SIZE, ttl=ICS_CACHE_TTL)
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: str) -> bool:
+    if not if_modified_since:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(
+            if_modified_since
+        )
+    except (TypeError, ValueError):
+        return False
+
+
+def _build_ics_entry(p: models.Ping) -> IcsEntry:
+    changed = p.updated_at or p.created_at or datetime.utcnow()
     # Aura-flavoured ICS UID & filename
-    ics = generate_ics(
-        f"aura-{ping_id}@aura",
+    body = generate_ics(
+        f"aura-{p.id}@aura",
         p.title,
         p.starts_at,
         120,
         p.location,
     )
-    return Response(
-        content=ics,
+    return IcsEntry(
+        version=p.version,
+        secret=p.ics_secret,
+        # from the rendered text: RSVPs and new invitees leave it unchanged
+        etag='"aura-' + hashlib.sha256(body.encode()).hexdigest()[:32] + '"',
+        last_modified=format_datetime(
+            changed.replace(tzinfo=timezone.utc), usegmt=True
+        ),
+        body=body,
+    )
+
+
+@r.get("/pings/{ping_id}/ics-public", dependencies=read_only)
+@in_session
+def ics_public(
+    ping_id: int,
+    sig: str,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    entry = ics_cache.get(ping_id)
+    if entry is None:
+        p = find_ping(db, ping_id)
+        if not p:
+            raise HTTPException(404)
+        entry = _build_ics_entry(p)
+        ics_cache.set(ping_id, entry)
+
+    if not hmac.compare_digest(sig.encode(), entry.secret.encode()):
+        raise HTTPException(404)
+
+    headers = {
+        "ETag": entry.etag,
+        "Last-Modified": entry.last_modified,
+        "Cache-Control": "private, max-age=0, must-revalidate",
+    }
+    inm = request.headers.get("if-none-match")
+    if etag_matches(inm, entry.etag) or (
+        inm is None
+        and not_modified_since(
+            request.headers.get("if-modified-since"), entry.last_modified
+        )
+    ):
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = f'attachment; filename="aura-{ping_id}.ics"'
+    return Response(content=entry.body, media_type="text/calendar", headers=headers)
+
+
+FEED_PAST_DAYS = int(os.getenv("CALENDAR_FEED_PAST_DAYS", "7"))
+FEED_MAX_EVENTS = int(os.getenv("CALENDAR_FEED_MAX_EVENTS", "500"))
+
+
+def feed_signature(user_id: int) -> str:
+    msg = f"calendar-feed:{user_id}".encode()
+    return hmac.new(SECRET_KEY.encode(), msg, hashlib.sha256).hexdigest()[:32]
+
+
+@r.get("/me/calendar-feed", response_model=schemas.CalendarFeedOut)
+def my_calendar_feed(user: models.User = Depends(current_user)):
+    """Subscribable URL with everything I created or accepted."""
+    return {"url": f"/api/calendar/{user.id}/feed.ics?sig={feed_signature(user.id)}"}
+
+
+@r.get("/calendar/{user_id}/feed.ics", dependencies=read_only)
+@in_session
+def calendar_feed(
+    user_id: int,
+    sig: str,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    if not hmac.compare_digest(sig.encode(), feed_signature(user_id).encode()):
+        raise HTTPException(404)
+    owner = db.get(models.User, user_id)
+    if not owner:
+        raise HTTPException(404)
+
+    accepted = exists().where(
+        models.PingInvite.ping_id == models.Ping.id,
+        models.PingInvite.invitee_id == user_id,
+        models.PingInvite.status == models.InviteStatus.accepted,
+    )
+    window = (
+        or_(models.Ping.creator_id == user_id, accepted),
+        models.Ping.starts_at >= datetime.utcnow() - timedelta(days=FEED_PAST_DAYS),
+    )
+
+    # Cheap fingerprint first so unchanged polls never build the body
+    count, id_sum, last_change = (
+        db.query(
+            func.count(models.Ping.id),
+            func.coalesce(func.sum(models.Ping.id), 0),
+            func.max(models.Ping.updated_at),
+        )
+        .filter(*window)
+        .one()
+    )
+    fingerprint = f"{user_id}:{owner.timezone}:{count}:{id_sum}:{last_change}"
+    etag = '"feed-' + hashlib.sha256(fingerprint.encode()).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"}
+    if last_change:
+        headers["Last-Modified"] = format_datetime(
+            last_change.replace(tzinfo=timezone.utc), usegmt=True
+        )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    rows = (
+        db.query(
+            models.Ping.id,
+            models.Ping.title,
+            models.Ping.starts_at,
+            models.Ping.location,
+            models.Ping.notes,
+            models.Ping.created_at,
+        )
+        .filter(*window)
+        .order_by(models.Ping.starts_at.asc())
+        .limit(FEED_MAX_EVENTS)
+        .all()
+    )
+    vevents = (
+        IcsEvent(
+            uid=f"aura-{row.id}@aura",
+            title=row.title,
+            starts_at=row.starts_at,
+            duration_minutes=120,
+            location=row.location,
+            description=row.notes,
+            stamp=row.created_at,
+        )
+        for row in rows
+    )
+    return StreamingResponse(
+        iter_calendar(vevents, tzid=owner.timezone, name="Aura"),
         media_type="text/calendar",
-        headers={"Content-Disposition": f'attachment; filename="aura-{ping_id}.ics"'},
+        headers=headers,
+    )
+
+
+# -------- Events (server push) --------
+
+SSE_KEEPALIVE_SECONDS = 15
+
+
+@r.get("/events")
+async def event_stream(
+    request: Request,
+    token: Optional[str] = None,
+    creds: Optional[HTTPAuthorizationCredentials] = Depends(
+        HTTPBearer(auto_error=False)
+    ),
+):
+    """Server-Sent Events: invite.created, rsvp.changed, friend.requested.
+
+    EventSource can't send headers, so the JWT may also be passed as ?token=.
+    """
+    raw = creds.credentials if creds else token
+    if not raw:
+        raise HTTPException(401, "Missing token")
+    try:
+        uid = int(decode_token(raw).get("sub"))
+    except (JWTError, ValueError, TypeError):
+        raise HTTPException(401, "Invalid token")
+
+    async def stream():
+        async with events.broker.subscribe(f"user:{uid}") as sub:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                event = await sub.get(timeout=SSE_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 # -------- Users --------
 
 
-@r.get("/users/search", response_model=List[schemas.UserOut])
+@r.get("/users/search", response_model=List[schemas.UserOut], dependencies=read_only)
+@in_session
 def search_users(
     q: str = Query(..., min_length=1),
     user: models.User = Depends(current_user),
     db: Session = Depends(get_db),
 ):
-    like = f"%{q.lower()}%"
-    return (
-        db.query(models.User)
-        .filter(models.User.id != user.id)
-        .filter((models.User.name.ilike(like)) | (models.User.email.ilike(like)))
-        .limit(25)
-        .all()
-    )
+    return search.search_users(db, user.id, q)
 
 
-@r.get("/users/{user_id}", response_model=schemas.UserOut)
+@r.get("/users/{user_id}", response_model=schemas.UserOut, dependencies=read_only)
+@in_session
 def get_user_profile(
     user_id: int,
     _: models.User = Depends(current_user),
@@ -357,42 +1034,39 @@ def get_user_profile(
     return u
 
 
+@r.get(
+    "/users/{user_id}/mutual",
+    response_model=List[schemas.UserOut],
+    dependencies=read_only,
+)
+@in_session
+def mutual_friends(
+    user_id: int,
+    user: models.User = Depends(current_user),
+    db: Session = Depends(get_db),
+):
+    ids = friend_graph.mutual(db, user.id, user_id)
+    if not ids:
+        return []
+    return (
+        db.query(models.User)
+        .filter(models.User.id.in_(ids))
+        .order_by(models.User.id)
+        .all()
+    )
+
+
 # -------- Unfriend --------
 
 
 @r.delete("/friends/{other_id}", status_code=204)
+@in_session
 def unfriend(
     other_id: int,
     user: models.User = Depends(current_user),
     db: Session = Depends(get_db),
 ):
-    """Remove friendship (and any pending requests) both ways."""
-    if hasattr(models, "Friendship"):
-        db.query(models.Friendship).filter(
-            or_(
-                and_(
-                    models.Friendship.user_id == user.id,
-                    models.Friendship.friend_id == other_id,
-                ),
-                and_(
-                    models.Friendship.user_id == other_id,
-                    models.Friendship.friend_id == user.id,
-                ),
-            )
-        ).delete(synchronize_session=False)
-
-    if hasattr(models, "FriendRequest"):
-        db.query(models.FriendRequest).filter(
-            or_(
-                and_(
-                    models.FriendRequest.requester_id == user.id,
-                    models.FriendRequest.recipient_id == other_id,
-                ),
-                and_(
-                    models.FriendRequest.requester_id == other_id,
-                    models.FriendRequest.recipient_id == user.id,
-                ),
-            )
-        ).delete(synchronize_session=False)
-
+    """Remove friendship (and any pending request) between us."""
+    _delete_friendship(db, user.id, other_id)
     db.commit()
+    friend_graph.remove_pair(user.id, other_id)
@@ -1,22 +1,37 @@
 # backend/app/auth.py
+import asyncio
+import functools
+import hashlib
+import multiprocessing
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from . import models
-from .db import SessionLocal
+from .cache import TTLCache
+from .db import DB_ASYNC, AsyncSessionLocal, SessionLocal
 
 # --- Config ---
 SECRET_KEY = os.getenv("JWT_SECRET", "dev-secret-change-me")
 ALGORITHM = os.getenv("JWT_ALG", "HS256")
 ACCESS_TOKEN_EXPIRES_MIN = int(os.getenv("JWT_EXPIRES_MIN", "60"))
 
+# Per-process caches for current_user (0 disables)
+USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
+USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+
 # Password hashing: support old bcrypt + new bcrypt_sha256
 pwd_ctx = CryptContext(
     schemes=["bcrypt_sha256", "bcrypt"],
@@ -27,7 +42,7 @@ bearer = HTTPBearer(auto_error=True)
 
 
 # --- DB dependency ---
-def get_db():
+def get_sync_db():
     db: Session = SessionLocal()
     try:
         yield db
@@ -35,13 +50,119 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Session handed to request handlers: AsyncSession when DB_ASYNC=1
+get_db = get_async_db if DB_ASYNC else get_sync_db
+
+
 # --- Password helpers ---
-def hash_pw(plain: str) -> str:
+# bcrypt costs ~250ms of CPU per call, so it runs in a dedicated process pool.
+# register/login are async and await the pool, so a login storm waits on the
+# event loop instead of holding threadpool threads. When the pool and its
+# queue are full we answer 503 right away.
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", str(HASH_WORKERS)))
+# Sync callers of hash_pw() still block a thread while they wait; keep the
+# cap well below anyio's default threadpool size (40) so they can't take it all.
+HASH_MAX_IN_FLIGHT = min(HASH_WORKERS + HASH_MAX_QUEUE, 16)
+
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_lock = threading.Lock()
+_hash_in_flight = 0
+
+
+def _hash(plain: str) -> str:
     return pwd_ctx.hash(plain)
 
 
+def _verify_and_update(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_ctx.verify_and_update(plain, hashed)
+
+
+def hash_queue_depth() -> int:
+    """Hashing jobs running or waiting in the pool."""
+    return _hash_in_flight
+
+
+def _pool_context():
+    # never fork: the server has threads (threadpool, scheduler, SSE broker)
+    # whose locks a forked child would inherit in whatever state they are in
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+def _admit() -> ProcessPoolExecutor:
+    """Count one hashing job in, or raise 503 when the pool is saturated."""
+    global _hash_pool, _hash_in_flight
+    with _hash_lock:
+        if _hash_in_flight >= HASH_MAX_IN_FLIGHT:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many sign-ins right now, try again",
+                headers={"Retry-After": "1"},
+            )
+        _hash_in_flight += 1
+        if _hash_pool is None:
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=HASH_WORKERS, mp_context=_pool_context()
+            )
+        return _hash_pool
+
+
+def _release() -> None:
+    global _hash_in_flight
+    with _hash_lock:
+        _hash_in_flight -= 1
+
+
+def _run_hashing(fn, *args):
+    if HASH_WORKERS <= 0:
+        return fn(*args)
+    pool = _admit()
+    try:
+        return pool.submit(fn, *args).result()
+    finally:
+        _release()
+
+
+async def _run_hashing_async(fn, *args):
+    if HASH_WORKERS <= 0:
+        # no pool, but still keep bcrypt off the event loop
+        return await run_in_threadpool(fn, *args)
+    pool = _admit()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+    finally:
+        _release()
+
+
+def hash_pw(plain: str) -> str:
+    return _run_hashing(_hash, plain)
+
+
+async def hash_pw_async(plain: str) -> str:
+    return await _run_hashing_async(_hash, plain)
+
+
 def verify_pw(plain: str, hashed: str) -> bool:
-    return pwd_ctx.verify(plain, hashed)
+    return verify_and_update_pw(plain, hashed)[0]
+
+
+def verify_and_update_pw(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Returns (ok, new_hash); new_hash is set when the stored hash is outdated."""
+    return _run_hashing(_verify_and_update, plain, hashed)
+
+
+async def verify_and_update_pw_async(
+    plain: str, hashed: str
+) -> Tuple[bool, Optional[str]]:
+    return await _run_hashing_async(_verify_and_update, plain, hashed)
 
 
 # --- JWT helpers ---
@@ -60,19 +181,102 @@ def decode_token(token: str) -> dict:
     return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
 
 
+# --- Caches ---
+# Verified token payloads keyed by token digest, kept until the token's exp
+token_cache = TTLCache(TOKEN_CACHE_SIZE)
+# Detached User snapshots keyed by id
+user_cache = TTLCache(USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+
+def decode_token_cached(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).digest()
+    data = token_cache.get(key)
+    if data is None:
+        data = decode_token(token)
+        token_cache.set(key, data, expires_at=data.get("exp"))
+    return data
+
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.pop(user_id)
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_user_on_write(mapper, connection, target) -> None:
+    invalidate_user(target.id)
+
+
+def _snapshot(user: models.User) -> models.User:
+    """Detached copy with all columns loaded, safe to share between sessions."""
+    copy = models.User(
+        **{c.key: getattr(user, c.key) for c in models.User.__table__.columns}
+    )
+    make_transient_to_detached(copy)
+    return copy
+
+
 # --- Auth dependency for protected routes ---
-def current_user(
-    creds: HTTPAuthorizationCredentials = Depends(bearer),
-    db: Session = Depends(get_db),
-) -> models.User:
-    token = creds.credentials
+def _token_claims(token: str) -> Tuple[int, Optional[int]]:
+    """(user id, issued-at) of a valid access token."""
     try:
-        data = decode_token(token)
-        uid = int(data.get("sub"))
-    except (JWTError, ValueError):
+        data = decode_token_cached(token)
+        return int(data.get("sub")), data.get("iat")
+    except (JWTError, ValueError, TypeError):
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(models.User).get(uid)
+
+def current_user_sync(
+    creds: HTTPAuthorizationCredentials = Depends(bearer),
+    db: Session = Depends(get_sync_db),
+) -> models.User:
+    uid, issued_at = _token_claims(creds.credentials)
+    db.info["issued_at"] = issued_at  # read-your-writes, see db.recently_wrote
+    cached = user_cache.get(uid)
+    if cached is not None:
+        # Attach a copy to this session without a SELECT
+        return db.merge(cached, load=False)
+
+    user = db.get(models.User, uid)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    user_cache.set(uid, _snapshot(user))
     return user
+
+
+async def current_user_async(
+    creds: HTTPAuthorizationCredentials = Depends(bearer),
+    db: AsyncSession = Depends(get_async_db),
+) -> models.User:
+    uid, issued_at = _token_claims(creds.credentials)
+    db.info["issued_at"] = issued_at
+    cached = user_cache.get(uid)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+
+    user = await db.get(models.User, uid)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    user_cache.set(uid, _snapshot(user))
+    return user
+
+
+current_user = current_user_async if DB_ASYNC else current_user_sync
+
+
+def in_session(handler):
+    """Run a sync `handler(..., db: Session)` on the request's AsyncSession.
+
+    No-op in sync mode. With DB_ASYNC=1 the handler becomes a coroutine whose
+    body runs through AsyncSession.run_sync, so its queries are awaited on
+    the event loop instead of occupying a threadpool thread. Handlers must
+    not block (password hashing is awaited in register/login instead).
+    """
+    if not DB_ASYNC:
+        return handler
+
+    @functools.wraps(handler)
+    async def wrapper(*args, db: AsyncSession, **kwargs):
+        return await db.run_sync(lambda session: handler(*args, db=session, **kwargs))
+
+    return wrapper
@@ -0,0 +1,185 @@
+# backend/app/availability.py
+"""Find the start times that suit most of an aura's participants.
+
+A participant is unavailable while they are at another open aura (one they
+created or accepted, AURA_DURATION long) and outside their waking hours,
+which are taken in their own User.timezone. Every unavailable interval is
+widened to the slot starts it rules out, (busy_start - duration, busy_end),
+and one sweep over the sorted interval edges and the candidate grid gives
+the busy set at each candidate start in O((intervals + slots) log n).
+"""
+import os
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import select, union_all
+from sqlalchemy.orm import Session
+
+from . import models
+
+AURA_DURATION = timedelta(minutes=120)  # same as the calendar feed
+SUGGEST_MAX_WINDOW = timedelta(days=int(os.getenv("SUGGEST_MAX_WINDOW_DAYS", "14")))
+
+Interval = Tuple[datetime, datetime]
+
+
+class Slot(NamedTuple):
+    starts_at: datetime  # naive UTC, like the database
+    busy_ids: frozenset
+
+
+def naive_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _zone(tzid: Optional[str]):
+    try:
+        return ZoneInfo(tzid) if tzid else timezone.utc
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def night_intervals(
+    tzid: Optional[str], start: datetime, end: datetime, day_start: int, day_end: int
+) -> List[Interval]:
+    """[day_end, next day_start) in local time for each night touching
+    [start, end), as naive UTC intervals."""
+    tz = _zone(tzid)
+
+    def local(d: date, hour: int) -> datetime:
+        wall = datetime.combine(d, time()) + timedelta(hours=hour)
+        return naive_utc(wall.replace(tzinfo=tz))
+
+    first = start.replace(tzinfo=timezone.utc).astimezone(tz).date() - timedelta(days=1)
+    last = end.replace(tzinfo=timezone.utc).astimezone(tz).date()
+    out = []
+    d = first
+    while d <= last:
+        out.append((local(d, day_end), local(d + timedelta(days=1), day_start)))
+        d += timedelta(days=1)
+    return out
+
+
+def busy_intervals(
+    db: Session, user_ids: List[int], start: datetime, end: datetime
+) -> Dict[int, List[Interval]]:
+    """{user_id: [(start, end)]} of the open auras each user is going to."""
+    ping, invite = models.Ping, models.PingInvite
+    in_window = (
+        ping.starts_at > start - AURA_DURATION,
+        ping.starts_at < end,
+        models.AURA_IS_OPEN,
+    )
+    created = select(ping.creator_id, ping.starts_at).where(
+        ping.creator_id.in_(user_ids), *in_window
+    )
+    accepted = (
+        select(invite.invitee_id, ping.starts_at)
+        .join(ping, ping.id == invite.ping_id)
+        .where(
+            invite.invitee_id.in_(user_ids),
+            invite.status == models.InviteStatus.accepted,
+            *in_window,
+        )
+    )
+    out: Dict[int, List[Interval]] = {uid: [] for uid in user_ids}
+    for user_id, starts_at in db.execute(union_all(created, accepted)):
+        out[user_id].append((starts_at, starts_at + AURA_DURATION))
+    return out
+
+
+def sweep(
+    blocked: Dict[int, Iterable[Interval]],
+    grid: List[datetime],
+    duration: timedelta,
+) -> List[frozenset]:
+    """Busy user ids for every slot start in `grid` (sorted).
+
+    A slot [s, s + duration) clashes with [b0, b1) iff b0 - duration < s < b1.
+    """
+    opens, closes = [], []
+    for user_id, intervals in blocked.items():
+        for b0, b1 in intervals:
+            opens.append((b0 - duration, user_id))
+            closes.append((b1, user_id))
+    opens.sort()
+    closes.sort()
+
+    depth: Dict[int, int] = {}
+    busy: set = set()
+    out = []
+    i = j = 0
+    for s in grid:
+        while i < len(opens) and opens[i][0] < s:
+            uid = opens[i][1]
+            depth[uid] = depth.get(uid, 0) + 1
+            busy.add(uid)
+            i += 1
+        while j < len(closes) and closes[j][0] <= s:
+            uid = closes[j][1]
+            depth[uid] -= 1
+            if not depth[uid]:
+                busy.discard(uid)
+            j += 1
+        out.append(frozenset(busy))
+    return out
+
+
+def best_slots(
+    grid: List[datetime], busy: List[frozenset], duration: timedelta, limit: int
+) -> List[Slot]:
+    """Fewest busy people first (earliest wins ties), never two overlapping."""
+    chosen: List[datetime] = []  # sorted
+    out = []
+    for k in sorted(range(len(grid)), key=lambda k: (len(busy[k]), k)):
+        s = grid[k]
+        pos = bisect_right(chosen, s)
+        if (pos and s - chosen[pos - 1] < duration) or (
+            pos < len(chosen) and chosen[pos] - s < duration
+        ):
+            continue
+        chosen.insert(pos, s)
+        out.append(Slot(s, busy[k]))
+        if len(out) == limit:
+            break
+    return out
+
+
+def candidate_grid(
+    start: datetime, end: datetime, duration: timedelta, step: timedelta
+) -> List[datetime]:
+    """Slot starts on multiples of `step` (from the epoch) inside [start, end)."""
+    epoch = datetime(1970, 1, 1)
+    s = epoch + -((epoch - start) // step) * step  # start, rounded up
+    grid = []
+    while s + duration <= end:
+        grid.append(s)
+        s += step
+    return grid
+
+
+def suggest_times(
+    db: Session,
+    users: List[models.User],
+    start: datetime,
+    end: datetime,
+    duration: timedelta,
+    step: timedelta,
+    limit: int,
+    day_start: int,
+    day_end: int,
+) -> List[Slot]:
+    """Best `limit` start times in [start, end) for everybody in `users`."""
+    grid = candidate_grid(start, end, duration, step)
+    if not grid:
+        return []
+    blocked = busy_intervals(db, [u.id for u in users], start, end)
+    for u in users:
+        blocked[u.id].extend(
+            night_intervals(u.timezone, start, end, day_start, day_end)
+        )
+    return best_slots(grid, sweep(blocked, grid, duration), duration, limit)
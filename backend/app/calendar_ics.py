@@ -1,26 +1,102 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, NamedTuple, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+class IcsEvent(NamedTuple):
+    uid: str
+    title: str
+    starts_at: datetime  # naive datetimes are UTC (that's how we store them)
+    duration_minutes: int
+    location: str
+    description: Optional[str] = None
+    stamp: Optional[datetime] = None  # DTSTAMP, defaults to starts_at
+
+
+def escape_text(value: str) -> str:
+    """RFC 5545 TEXT escaping."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Fold content lines longer than 75 octets (without splitting UTF-8)."""
+    raw = line.encode()
+    if len(raw) <= 75:
+        return line
+    parts, start, limit = [], 0, 75
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:
+            end -= 1  # don't cut a multi-byte character
+        parts.append(raw[start:end].decode())
+        start, limit = end, 74  # continuation lines start with a space
+    return "\r\n ".join(parts)
+
+
+def _utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _dt_prop(name: str, dt: datetime) -> str:
+    return f"{name}:{_utc(dt).strftime('%Y%m%dT%H%M%SZ')}"
+
+
+def _zone(tzid: Optional[str]) -> Optional[ZoneInfo]:
+    if not tzid:
+        return None
+    try:
+        return ZoneInfo(tzid)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def iter_calendar(
+    events: Iterable[IcsEvent],
+    tzid: Optional[str] = None,
+    name: Optional[str] = None,
+) -> Iterator[str]:
+    """Yield a VCALENDAR chunk by chunk (one VEVENT per chunk).
+
+    Times are always written as UTC, so no VTIMEZONE is needed. A valid
+    `tzid` (e.g. User.timezone) becomes X-WR-TIMEZONE, a display hint.
+    """
+    tz = _zone(tzid)
+    head = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Aura//EN"]
+    if name:
+        head.append(fold(f"X-WR-CALNAME:{escape_text(name)}"))
+    if tz is not None:
+        head.append(f"X-WR-TIMEZONE:{tz.key}")
+    yield "\r\n".join(head) + "\r\n"
+
+    for ev in events:
+        lines = [
+            "BEGIN:VEVENT",
+            fold(f"UID:{ev.uid}"),
+            _dt_prop("DTSTAMP", ev.stamp or ev.starts_at),
+            _dt_prop("DTSTART", ev.starts_at),
+            _dt_prop("DTEND", ev.starts_at + timedelta(minutes=ev.duration_minutes)),
+            fold(f"SUMMARY:{escape_text(ev.title)}"),
+            fold(f"LOCATION:{escape_text(ev.location)}"),
+        ]
+        if ev.description:
+            lines.append(fold(f"DESCRIPTION:{escape_text(ev.description)}"))
+        lines.append("END:VEVENT")
+        yield "\r\n".join(lines) + "\r\n"
+
+    yield "END:VCALENDAR\r\n"
 
 
 def generate_ics(
     uid: str, title: str, starts_at: datetime, duration_minutes: int, location: str
 ) -> str:
-    dtstart = starts_at.strftime("%Y%m%dT%H%M%SZ")
-    dtend = (starts_at + timedelta(minutes=duration_minutes)).strftime("%Y%m%dT%H%M%SZ")
-
-    return "\r\n".join(
-        [
-            "BEGIN:VCALENDAR",
-            "VERSION:2.0",
-            "PRODID:-//Aura//EN",
-            "BEGIN:VEVENT",
-            f"UID:{uid}",
-            f"DTSTAMP:{dtstart}",
-            f"DTSTART:{dtstart}",
-            f"DTEND:{dtend}",
-            f"SUMMARY:{title}",
-            f"LOCATION:{location}",
-            "END:VEVENT",
-            "END:VCALENDAR",
-            "",
-        ]
+    return "".join(
+        iter_calendar([IcsEvent(uid, title, starts_at, duration_minutes, location)])
     )
@@ -1,13 +1,297 @@
 import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import Delete, Insert, Update, create_engine, event
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .instrumentation import current_stats
 
 # Renamed database to match Aura
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./aura.sqlite3")
 
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+# --- Engine profile (env overridable) ---
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1").lower() in ("1", "true", "yes")
+
+# SQLite: WAL lets readers run alongside the single writer, and busy_timeout
+# makes concurrent writers wait instead of failing with "database is locked"
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store": "MEMORY",
+    "cache_size": -int(os.getenv("SQLITE_CACHE_KB", "20000")),
+}
+
+
+class PoolWaitStats:
+    """How long requests wait to check a connection out of the pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            self.timeouts += timed_out
+
+
+pool_wait = PoolWaitStats()
+
+
+class _TimedCheckout:
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = True
+        try:
+            conn = super()._do_get()
+            timed_out = False
+            return conn
+        finally:
+            pool_wait.observe(time.perf_counter() - start, timed_out)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.endswith("://"))
+
+
+def engine_options(url: str, async_: bool = False) -> dict:
+    opts = {}
+    if url.startswith("sqlite"):
+        if not async_:
+            opts["connect_args"] = {"check_same_thread": False}
+        if _is_memory_sqlite(url):
+            return opts  # single shared connection, no pool tuning
+    opts.update(
+        poolclass=TimedAsyncQueuePool if async_ else TimedQueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=POOL_PRE_PING,
+    )
+    return opts
+
+
+def apply_sqlite_pragmas(sync_engine) -> None:
+    if sync_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cur.execute(f"PRAGMA {name}={value}")
+        cur.close()
+
+
+def track_queries(sync_engine) -> None:
+    """Count statements and DB time into the current request's stats."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        stats = current_stats.get()
+        if stats is not None:
+            stats.observe(statement, time.perf_counter() - started)
+
+
+def pool_stats(eng=None) -> dict:
+    """Pool utilisation + checkout wait, for logs and the metrics endpoint."""
+    pool = (eng or engine).pool
+    stats = {
+        "checkouts": pool_wait.checkouts,
+        "checkout_wait_seconds_total": pool_wait.wait_seconds_total,
+        "checkout_wait_seconds_max": pool_wait.wait_seconds_max,
+        "checkout_timeouts": pool_wait.timeouts,
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=POOL_MAX_OVERFLOW,
+        )
+    return stats
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+apply_sqlite_pragmas(engine)
+track_queries(engine)
+
+# --- Read replicas ---
+# Comma-separated, same schema as DATABASE_URL. Routes marked read-only (see
+# api.use_replica) read from them; writes and everything else use the primary.
+DATABASE_REPLICA_URLS = [
+    u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()
+]
+# After a client's write, its reads stay on the primary this long
+REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+replica_engines = []
+for _url in DATABASE_REPLICA_URLS:
+    replica_engines.append(create_engine(_url, **engine_options(_url)))
+    apply_sqlite_pragmas(replica_engines[-1])
+    track_queries(replica_engines[-1])
+
+
+class WriteMark:
+    """The client's last write, as carried by the request (and updated by it).
+
+    The time travels with the client (cookie / X-Last-Write header, see
+    middleware.ReadYourWritesMiddleware), so stickiness holds whichever
+    worker serves the next request.
+    """
+
+    def __init__(self, wrote_at: Optional[float] = None):
+        self.wrote_at = wrote_at
+        self.wrote = False  # this request wrote: send the new time back
+
+
+last_write: ContextVar[Optional[WriteMark]] = ContextVar("last_write", default=None)
+
+
+def recently_wrote(info: dict) -> bool:
+    """Did this client write (or get its token) within REPLICA_STICKY_SECONDS?
+
+    The token's issue time covers a fresh register/login even before the
+    client has echoed a write mark back.
+    """
+    mark = last_write.get()
+    now = time.time()
+    return any(
+        t is not None and now - t < REPLICA_STICKY_SECONDS
+        for t in (mark.wrote_at if mark else None, info.get("issued_at"))
+    )
+
+
+class RoutingSession(Session):
+    """Session that sends reads of read-only requests to a replica.
+
+    session.info keys: "read_only" (set per route), "issued_at" (token iat,
+    set by auth) and "wrote" (this session wrote -> stay primary).
+    """
+
+    primary = engine
+    replicas = replica_engines
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info["wrote"] = True
+            return self.primary
+        if (
+            self.replicas
+            and self.info.get("read_only")
+            and not self.info.get("wrote")
+            and not recently_wrote(self.info)
+        ):
+            if "replica" not in self.info:
+                self.info["replica"] = random.choice(self.replicas)
+            return self.info["replica"]
+        return self.primary
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_write(session) -> None:
+    mark = last_write.get()
+    if session.info.pop("wrote", False) and mark is not None:
+        mark.wrote_at = time.time()
+        mark.wrote = True
+
+
+def conflict_insert(db: Session, model):
+    """Dialect insert() with ON CONFLICT support, or None if unavailable."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite_insert(model)
+    if dialect == "postgresql":
+        return pg_insert(model)
+    return None
+
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine
+)
 Base = declarative_base()
+
+# --- Async mode (DB_ASYNC=1) ---
+# Request handlers then run on an AsyncSession instead of Starlette's
+# threadpool: aiosqlite for SQLite, asyncpg for Postgres (install it
+# separately). The sync engine above is still used for DDL.
+DB_ASYNC = os.getenv("DB_ASYNC", "0").lower() in ("1", "true", "yes")
+
+
+def async_url(url: str) -> str:
+    """sqlite:///x -> sqlite+aiosqlite:///x, postgresql://... -> +asyncpg."""
+    scheme, rest = url.split("://", 1)
+    base = scheme.split("+", 1)[0]
+    driver = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}.get(base)
+    if driver is None:
+        raise ValueError(f"No async driver known for {scheme}")
+    return f"{base}+{driver}://{rest}"
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or (
+    async_url(DATABASE_URL) if DB_ASYNC else None
+)
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, async_=True)
+    )
+    apply_sqlite_pragmas(async_engine.sync_engine)
+    track_queries(async_engine.sync_engine)
+
+    async_replica_engines = []
+    for _url in DATABASE_REPLICA_URLS:
+        _url = async_url(_url)
+        async_replica_engines.append(
+            create_async_engine(_url, **engine_options(_url, async_=True))
+        )
+        apply_sqlite_pragmas(async_replica_engines[-1].sync_engine)
+        track_queries(async_replica_engines[-1].sync_engine)
+
+    class AsyncRoutingSession(RoutingSession):
+        primary = async_engine.sync_engine
+        replicas = [e.sync_engine for e in async_replica_engines]
+
+    # expire_on_commit=False: returned rows must stay loaded after commit,
+    # lazy loads outside the session's greenlet are not possible
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        sync_session_class=AsyncRoutingSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
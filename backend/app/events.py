@@ -0,0 +1,172 @@
+# backend/app/events.py
+"""Tiny pub/sub used to push invite/RSVP/friend events to connected clients.
+
+Handlers call `publish(user_id, "invite.created", ...)` after committing. Subscribers are
+SSE streams (see api.event_stream) waiting on a per-connection queue.
+
+Backends (EVENTS_BROKER):
+  memory             -> single process, default
+  sqlite:///<path>   -> local broker stand-in shared by several uvicorn
+                        workers on the same host; each worker tails the file
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Optional
+
+EVENTS_BROKER = os.getenv("EVENTS_BROKER", "memory")
+QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+
+logger = logging.getLogger("aura.events")
+
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def push(self, event: dict) -> None:
+        # Called from any thread (sync handlers run in the threadpool)
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass  # slow consumer, drop; clients resync via /pings/changes
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class MemoryBroker:
+    def __init__(self):
+        self._subs = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, event: dict) -> None:
+        self._deliver(channel, event)
+
+    def _deliver(self, channel: str, event: dict) -> None:
+        with self._lock:
+            subs = list(self._subs.get(channel, ()))
+        for sub in subs:
+            try:
+                sub.push(event)
+            except RuntimeError:
+                pass  # event loop already closed
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        sub = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subs[channel].add(sub)
+        try:
+            yield sub
+        finally:
+            with self._lock:
+                self._subs[channel].discard(sub)
+                if not self._subs[channel]:
+                    del self._subs[channel]
+
+
+class SqliteBroker(MemoryBroker):
+    """Cross-process fan-out through a shared SQLite file.
+
+    publish() appends a row; a daemon thread in every process polls for new
+    rows and hands them to that process's local subscribers.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.2, ttl: float = 60.0):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self.ttl = ttl
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, "
+                "payload TEXT NOT NULL, created REAL NOT NULL)"
+            )
+        finally:
+            conn.close()
+        self._thread: Optional[threading.Thread] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def publish(self, channel: str, event: dict) -> None:
+        conn = self._connect()
+        try:
+            now = time.time()
+            conn.execute(
+                "INSERT INTO events (channel, payload, created) VALUES (?, ?, ?)",
+                (channel, json.dumps(event), now),
+            )
+            conn.execute("DELETE FROM events WHERE created < ?", (now - self.ttl,))
+        finally:
+            conn.close()
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        self._ensure_poller()
+        async with super().subscribe(channel) as sub:
+            yield sub
+
+    def _ensure_poller(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._poll, daemon=True)
+                self._thread.start()
+
+    def _poll(self) -> None:
+        # Errors (locked or replaced file, bad row) are logged and the poll
+        # goes on with a fresh connection; the thread must not die with them.
+        conn, last_id = None, None
+        while True:
+            try:
+                if conn is None:
+                    conn = self._connect()
+                if last_id is None:
+                    (last_id,) = conn.execute(
+                        "SELECT COALESCE(MAX(id), 0) FROM events"
+                    ).fetchone()
+                rows = conn.execute(
+                    "SELECT id, channel, payload FROM events WHERE id > ? ORDER BY id",
+                    (last_id,),
+                ).fetchall()
+                for last_id, channel, payload in rows:
+                    self._deliver(channel, json.loads(payload))
+            except Exception:
+                logger.exception("event poll of %s failed", self.path)
+                if conn is not None:
+                    conn.close()
+                    conn = None
+            time.sleep(self.poll_interval)
+
+
+def make_broker(url: str):
+    if url == "memory":
+        return MemoryBroker()
+    if url.startswith("sqlite:///"):
+        return SqliteBroker(url[len("sqlite:///") :])
+    raise ValueError(f"Unsupported EVENTS_BROKER: {url}")
+
+
+broker = make_broker(EVENTS_BROKER)
+
+
+def publish(recipient_id: int, type_: str, /, **data) -> None:
+    broker.publish(f"user:{recipient_id}", {"type": type_, **data})
@@ -0,0 +1,328 @@
+# backend/app/graph.py
+"""In-memory friend adjacency, loaded lazily per user and kept write-through.
+
+Read paths (friends, incoming requests, invitee validation in create_ping)
+ask the graph instead of rebuilding the set from `friendships` every time.
+Write endpoints update it right after commit. Entries also expire after
+FRIEND_GRAPH_TTL seconds, which bounds staleness across uvicorn workers;
+checks that would reject someone (invitee validation) confirm a "not a
+friend" answer against the database first.
+
+Mutual friends intersect sorted friend arrays. Friend suggestions are
+friend-of-friend counts per user, computed once from the friends'
+adjacencies and then adjusted in place whenever an accepted edge appears
+or disappears, instead of being recomputed.
+"""
+import os
+import threading
+from bisect import bisect_left
+from collections import Counter
+from heapq import nsmallest
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from . import models
+from .cache import TTLCache
+
+FRIEND_GRAPH_CACHE_SIZE = int(os.getenv("FRIEND_GRAPH_CACHE_SIZE", "10000"))
+FRIEND_GRAPH_TTL = float(os.getenv("FRIEND_GRAPH_TTL", "300"))
+FRIEND_SUGGESTIONS_CACHE_SIZE = int(os.getenv("FRIEND_SUGGESTIONS_CACHE_SIZE", "2000"))
+LOAD_CHUNK = 500  # ids per IN (...) when loading many adjacencies
+
+Status = models.FriendshipStatus
+
+
+class Adjacency:
+    """Friendships of one user: other user id -> (status, requester_id)."""
+
+    def __init__(self):
+        self.edges: Dict[int, Tuple[Status, Optional[int]]] = {}
+        self._sorted: Optional[Tuple[int, ...]] = None
+
+    def set(self, other: int, status: Status, requester_id: Optional[int]) -> None:
+        self.edges[other] = (status, requester_id)
+        self._sorted = None
+
+    def discard(self, other: int) -> None:
+        self.edges.pop(other, None)
+        self._sorted = None
+
+    def friends(self) -> Set[int]:
+        return {o for o, (s, _) in self.edges.items() if s == Status.accepted}
+
+    def sorted_friends(self) -> Tuple[int, ...]:
+        if self._sorted is None:
+            self._sorted = tuple(sorted(self.friends()))
+        return self._sorted
+
+    def incoming(self, me: int) -> Set[int]:
+        # requester_id is NULL for legacy rows: show those to both sides
+        return {
+            o
+            for o, (s, requester) in self.edges.items()
+            if s == Status.pending and requester != me
+        }
+
+
+class Suggestions:
+    """Friend-of-friend counts of one user: candidate id -> mutual friends.
+
+    `friends` is the user's own friend set, kept in step with the counts.
+    """
+
+    def __init__(self, user_id: int, friends: Set[int], counts: Counter):
+        self.user_id = user_id
+        self.friends = friends
+        self.counts = counts
+
+    def bump(self, candidate: int, delta: int) -> None:
+        if candidate == self.user_id or candidate in self.friends:
+            return
+        n = self.counts.get(candidate, 0) + delta
+        if n > 0:
+            self.counts[candidate] = n
+        else:
+            self.counts.pop(candidate, None)
+
+    def link(self, other: int, other_friends: Sequence[int], added: bool) -> None:
+        """Our own edge to `other` appeared or went away."""
+        if added:
+            self.counts.pop(other, None)
+            self.friends.add(other)
+            for c in other_friends:
+                self.bump(c, 1)
+        else:
+            self.friends.discard(other)
+            for c in other_friends:
+                self.bump(c, -1)
+            mutual = sum(1 for c in other_friends if c in self.friends)
+            if mutual:
+                self.counts[other] = mutual
+
+
+def intersect_sorted(a: Sequence[int], b: Sequence[int]) -> List[int]:
+    """Common items of two sorted sequences.
+
+    Walks the shorter one and binary-searches the longer from the last hit,
+    so 20 friends against 2,000 costs ~20 * log2(2000) steps.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    out: List[int] = []
+    lo, n = 0, len(b)
+    for x in a:
+        lo = bisect_left(b, x, lo)
+        if lo == n:
+            break
+        if b[lo] == x:
+            out.append(x)
+            lo += 1
+    return out
+
+
+def friend_ids_select(user_id: int):
+    """SELECT of the user's accepted friend ids (for use in subqueries)."""
+    f = models.Friendship
+    accepted = Status.accepted
+    return union_all(
+        select(f.high_id).where(f.low_id == user_id, f.status == accepted),
+        select(f.low_id).where(f.high_id == user_id, f.status == accepted),
+    )
+
+
+class FriendGraph:
+    def __init__(self, maxsize: int, ttl: float, suggestions_size: int):
+        self.cache = TTLCache(maxsize, ttl=ttl)
+        self.scores = TTLCache(suggestions_size, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session, user_id: int) -> Adjacency:
+        return self._load_many(db, [user_id])[user_id]
+
+    def _load_many(self, db: Session, user_ids: List[int]) -> Dict[int, Adjacency]:
+        loaded = {uid: Adjacency() for uid in user_ids}
+        for i in range(0, len(user_ids), LOAD_CHUNK):
+            chunk = user_ids[i : i + LOAD_CHUNK]
+            rows = db.query(models.Friendship).filter(
+                or_(
+                    models.Friendship.low_id.in_(chunk),
+                    models.Friendship.high_id.in_(chunk),
+                )
+            )
+            for fr in rows:
+                for me, other in ((fr.low_id, fr.high_id), (fr.high_id, fr.low_id)):
+                    if me in loaded:
+                        loaded[me].set(other, fr.status, fr.requester_id)
+        return loaded
+
+    def adjacency(self, db: Session, user_id: int) -> Adjacency:
+        adj = self.cache.get(user_id)
+        if adj is None:
+            loaded = self._load(db, user_id)  # outside the lock
+            with self._lock:
+                adj = self.cache.get(user_id)
+                if adj is None:
+                    adj = loaded
+                    self.cache.set(user_id, adj)
+        return adj
+
+    def adjacency_many(
+        self, db: Session, user_ids: Iterable[int]
+    ) -> Dict[int, Adjacency]:
+        """Like adjacency() for many users, loading the missing ones together."""
+        user_ids = list(user_ids)
+        found = {}
+        for uid in user_ids:
+            adj = self.cache.get(uid)
+            if adj is not None:
+                found[uid] = adj
+        missing = [uid for uid in user_ids if uid not in found]
+        if missing:
+            loaded = self._load_many(db, missing)
+            with self._lock:
+                for uid, adj in loaded.items():
+                    cached = self.cache.get(uid)
+                    if cached is None:
+                        self.cache.set(uid, adj)
+                    found[uid] = cached or adj
+        return found
+
+    def friends(self, db: Session, user_id: int) -> Set[int]:
+        adj = self.adjacency(db, user_id)
+        with self._lock:
+            return adj.friends()
+
+    def incoming(self, db: Session, user_id: int) -> Set[int]:
+        adj = self.adjacency(db, user_id)
+        with self._lock:
+            return adj.incoming(user_id)
+
+    def confirm_friends(
+        self, db: Session, user_id: int, other_ids: Iterable[int]
+    ) -> Set[int]:
+        """Which of `other_ids` are friends of user_id, asking the database.
+
+        For ids the cached adjacency says are not friends: it may predate an
+        approval handled by another worker. Rows found refresh the cache.
+        """
+        pairs = [models.Friendship.pair(user_id, o) for o in other_ids]
+        if not pairs:
+            return set()
+        f = models.Friendship
+        rows = db.query(f.low_id, f.high_id, f.status, f.requester_id).filter(
+            or_(*(and_(f.low_id == low, f.high_id == high) for low, high in pairs))
+        )
+        confirmed = set()
+        for low, high, status, requester_id in rows:
+            other = high if low == user_id else low
+            self.set_edge(user_id, other, status, requester_id)
+            if status == Status.accepted:
+                confirmed.add(other)
+        return confirmed
+
+    def mutual(self, db: Session, a_id: int, b_id: int) -> List[int]:
+        """Sorted ids of the friends a and b have in common."""
+        adjs = self.adjacency_many(db, [a_id, b_id])
+        with self._lock:
+            return intersect_sorted(
+                adjs[a_id].sorted_friends(), adjs[b_id].sorted_friends()
+            )
+
+    def suggestions(
+        self, db: Session, user_id: int, limit: int
+    ) -> List[Tuple[int, int]]:
+        """Top [(user_id, mutual friend count)] I have no friendship row with."""
+        scores = self.scores.get(user_id)
+        if scores is None:
+            friends = self.friends(db, user_id)
+            adjs = self.adjacency_many(db, sorted(friends))
+            counts: Counter = Counter()
+            with self._lock:
+                for adj in adjs.values():
+                    counts.update(adj.sorted_friends())
+            for f in friends:
+                counts.pop(f, None)
+            counts.pop(user_id, None)
+            with self._lock:
+                scores = self.scores.get(user_id)
+                if scores is None:
+                    scores = Suggestions(user_id, friends, counts)
+                    self.scores.set(user_id, scores)
+
+        adj = self.adjacency(db, user_id)
+        with self._lock:
+            # pending requests either way are left out, not un-counted
+            return nsmallest(
+                limit,
+                ((c, n) for c, n in scores.counts.items() if c not in adj.edges),
+                key=lambda item: (-item[1], item[0]),
+            )
+
+    # -- write-through (call after commit) --
+
+    def _were_friends(self, a_id: int, b_id: int) -> Optional[bool]:
+        """Whether a and b were friends before this write, None if unknown."""
+        for me, other in ((a_id, b_id), (b_id, a_id)):
+            adj = self.cache.get(me)
+            if adj is not None:
+                return other in adj.edges and adj.edges[other][0] == Status.accepted
+            scores = self.scores.get(me)
+            if scores is not None:
+                return other in scores.friends
+        return None
+
+    def _edge_changed(self, a_id: int, b_id: int, added: Optional[bool]) -> None:
+        """Adjust cached suggestions for an accepted edge a-b that appeared
+        (added=True) or went away (False); None means we cannot tell, so the
+        entries that could be affected are dropped."""
+        for x, scores in self.scores.items():
+            if x in (a_id, b_id):
+                other = b_id if x == a_id else a_id
+                adj = self.cache.get(other)
+                if added is None or adj is None:
+                    self.scores.pop(x)
+                else:
+                    scores.link(other, adj.sorted_friends(), added)
+                continue
+            for me, other in ((a_id, b_id), (b_id, a_id)):
+                if me in scores.friends:
+                    if added is None:
+                        self.scores.pop(x)
+                        break
+                    scores.bump(other, 1 if added else -1)
+
+    def set_edge(
+        self, a_id: int, b_id: int, status: Status, requester_id: Optional[int]
+    ) -> None:
+        """The pair's row now has this status/requester."""
+        with self._lock:
+            were = self._were_friends(a_id, b_id)
+            for me, other in ((a_id, b_id), (b_id, a_id)):
+                adj = self.cache.get(me)
+                if adj is not None:
+                    adj.set(other, status, requester_id)
+            now = status == Status.accepted
+            if were is None or were != now:
+                self._edge_changed(a_id, b_id, None if were is None else now)
+
+    def remove_pair(self, a_id: int, b_id: int) -> None:
+        """The pair's row is gone."""
+        with self._lock:
+            were = self._were_friends(a_id, b_id)
+            for me, other in ((a_id, b_id), (b_id, a_id)):
+                adj = self.cache.get(me)
+                if adj is not None:
+                    adj.discard(other)
+            if were is not False:
+                self._edge_changed(a_id, b_id, None if were is None else False)
+
+    def clear(self) -> None:
+        self.cache.clear()
+        self.scores.clear()
+
+
+friend_graph = FriendGraph(
+    FRIEND_GRAPH_CACHE_SIZE, FRIEND_GRAPH_TTL, FRIEND_SUGGESTIONS_CACHE_SIZE
+)
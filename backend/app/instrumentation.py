@@ -0,0 +1,118 @@
+# backend/app/instrumentation.py
+"""Per-request query count and latency.
+
+RequestTimingMiddleware puts a RequestStats in a context variable for the
+duration of each request; the engine hooks in db.track_queries add every
+statement to it. The totals go out as a Server-Timing header (visible in
+the browser dev tools), an X-Query-Count header and one JSON log line.
+"""
+import json
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+logger = logging.getLogger("aura.requests")
+
+# Requests slower than this (or with more queries) are logged as warnings
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_REQUEST_QUERIES = int(os.getenv("SLOW_REQUEST_QUERIES", "20"))
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def observe(self, statement: str, seconds: float) -> None:
+        self.queries += 1
+        self.db_seconds += seconds
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+current_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_stats", default=None
+)
+
+
+def route_template(scope) -> str:
+    """/api/pings/{ping_id} rather than /api/pings/42 (falls back to the path)."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope.get("path", "")
+
+
+def server_timing(stats: RequestStats, handler_seconds: float) -> str:
+    parts = [
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries"',
+        f"app;dur={handler_seconds * 1000:.2f}",
+    ]
+    if stats.queries:
+        parts.append(f"db-slowest;dur={stats.slowest_seconds * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class RequestTimingMiddleware:
+    """Plain ASGI middleware (BaseHTTPMiddleware would break streaming/SSE)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        status = {"code": 500, "handler_seconds": None}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                handler_seconds = stats.elapsed()
+                status.update(code=message["status"], handler_seconds=handler_seconds)
+                headers = list(message.get("headers", []))
+                headers.append(
+                    (b"server-timing", server_timing(stats, handler_seconds).encode())
+                )
+                headers.append((b"x-query-count", str(stats.queries).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_stats.reset(token)
+            _log_request(scope, status, stats)
+
+
+def _log_request(scope, status: dict, stats: RequestStats) -> None:
+    handler_seconds = status["handler_seconds"] or stats.elapsed()
+    slow = (
+        handler_seconds * 1000 >= SLOW_REQUEST_MS
+        or stats.queries >= SLOW_REQUEST_QUERIES
+    )
+    level = logging.WARNING if slow else logging.INFO
+    if not logger.isEnabledFor(level):
+        return
+    record = {
+        "method": scope.get("method"),
+        "route": route_template(scope),
+        "status": status["code"],
+        "queries": stats.queries,
+        "db_ms": round(stats.db_seconds * 1000, 2),
+        "handler_ms": round(handler_seconds * 1000, 2),
+        "total_ms": round(stats.elapsed() * 1000, 2),
+    }
+    if stats.slowest_statement is not None:
+        record["slowest_ms"] = round(stats.slowest_seconds * 1000, 2)
+        record["slowest_sql"] = " ".join(stats.slowest_statement.split())[:500]
+    logger.log(level, json.dumps(record))
@@ -0,0 +1,140 @@
+# backend/app/jobs.py
+"""Periodic jobs, registered on the scheduler (see scheduler.py)."""
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import DateTime, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from . import models, reminders
+from .scheduler import scheduler
+
+# an aura is closed this long after it started
+AURA_CLOSE_GRACE = timedelta(
+    minutes=float(os.getenv("AURA_CLOSE_GRACE_MINUTES", "360"))
+)
+AURA_CLOSE_BATCH = int(os.getenv("AURA_CLOSE_BATCH", "500"))
+AURA_CLOSE_MAX_BATCHES = int(os.getenv("AURA_CLOSE_MAX_BATCHES", "20"))
+AURA_CLOSE_INTERVAL = float(os.getenv("AURA_CLOSE_INTERVAL_SECONDS", "300"))
+
+
+def close_past_auras(
+    db: Session,
+    now: Optional[datetime] = None,
+    batch_size: int = AURA_CLOSE_BATCH,
+    max_batches: int = AURA_CLOSE_MAX_BATCHES,
+) -> int:
+    """Set status=closed on open auras that started before now - grace.
+
+    Works in batches of `batch_size` ids, one commit each, so the write lock
+    is never held for long; the rest is picked up on the next run.
+    """
+    cutoff = (now or datetime.utcnow()) - AURA_CLOSE_GRACE
+    closed = 0
+    for _ in range(max_batches):
+        ids = [
+            pid
+            for (pid,) in db.query(models.Ping.id)
+            .filter(models.AURA_IS_OPEN, models.Ping.starts_at < cutoff)
+            .order_by(models.Ping.starts_at)
+            .limit(batch_size)
+        ]
+        if not ids:
+            break
+        # not a content change: version/updated_at stay as they are (the
+        # explicit SET keeps the column's onupdate from stamping it)
+        db.query(models.Ping).filter(models.Ping.id.in_(ids)).update(
+            {
+                models.Ping.status: models.AuraStatus.closed,
+                models.Ping.updated_at: models.Ping.updated_at,
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        closed += len(ids)
+        if len(ids) < batch_size:
+            break
+    return closed
+
+
+ARCHIVE_AFTER = timedelta(days=float(os.getenv("ARCHIVE_AFTER_DAYS", "90")))
+ARCHIVE_BATCH = int(os.getenv("ARCHIVE_BATCH", "200"))
+ARCHIVE_MAX_BATCHES = int(os.getenv("ARCHIVE_MAX_BATCHES", "20"))
+ARCHIVE_INTERVAL = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+_AURA_COLUMNS = [c.name for c in models.Ping.__table__.columns]
+_INVITE_COLUMNS = [c.name for c in models.PingInvite.__table__.columns]
+
+
+def _archivable_ids(db: Session, cutoff: datetime, limit: int) -> list:
+    ping, invite = models.Ping, models.PingInvite
+    q = db.query(ping.id).filter(
+        ping.status == models.AuraStatus.closed, ping.starts_at < cutoff
+    )
+    # SQLite reuses the highest rowid once it is deleted; keep the rows that
+    # hold the current max ids so archived ids are never handed out again
+    max_ping = db.query(func.max(ping.id)).scalar()
+    max_invite = db.query(func.max(invite.id)).scalar()
+    if max_ping is not None:
+        q = q.filter(ping.id != max_ping)
+    if max_invite is not None:
+        q = q.filter(
+            ~ping.id.in_(select(invite.ping_id).where(invite.id == max_invite))
+        )
+    return [pid for (pid,) in q.order_by(ping.starts_at).limit(limit)]
+
+
+def archive_old_auras(
+    db: Session,
+    now: Optional[datetime] = None,
+    batch_size: int = ARCHIVE_BATCH,
+    max_batches: int = ARCHIVE_MAX_BATCHES,
+) -> int:
+    """Move closed auras older than ARCHIVE_AFTER, with their invites, to
+    auras_archive / aura_invites_archive.
+
+    Each batch is copy + delete in one short transaction, so a row is always
+    in exactly one of the two tables. api.find_ping falls back to the archive.
+    """
+    cutoff = (now or datetime.utcnow()) - ARCHIVE_AFTER
+    archived_at = datetime.utcnow()
+    moved = 0
+    for _ in range(max_batches):
+        ids = _archivable_ids(db, cutoff, batch_size)
+        if not ids:
+            break
+        aura_cols = [models.Ping.__table__.c[n] for n in _AURA_COLUMNS]
+        db.execute(
+            insert(models.ArchivedPing).from_select(
+                _AURA_COLUMNS + ["archived_at"],
+                select(*aura_cols, literal(archived_at, DateTime)).where(
+                    models.Ping.id.in_(ids)
+                ),
+            )
+        )
+        invite_cols = [models.PingInvite.__table__.c[n] for n in _INVITE_COLUMNS]
+        db.execute(
+            insert(models.ArchivedPingInvite).from_select(
+                _INVITE_COLUMNS,
+                select(*invite_cols).where(models.PingInvite.ping_id.in_(ids)),
+            )
+        )
+        db.query(models.PingInvite).filter(models.PingInvite.ping_id.in_(ids)).delete(
+            synchronize_session=False
+        )
+        db.query(models.Ping).filter(models.Ping.id.in_(ids)).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        moved += len(ids)
+        if len(ids) < batch_size:
+            break
+    return moved
+
+
+scheduler.add_job("close_past_auras", AURA_CLOSE_INTERVAL, close_past_auras)
+scheduler.add_job("archive_old_auras", ARCHIVE_INTERVAL, archive_old_auras)
+scheduler.add_job(
+    "deliver_reminders", reminders.REMINDER_INTERVAL, reminders.deliver_due
+)
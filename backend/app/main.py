@@ -1,13 +1,32 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from . import api
+from . import jobs  # noqa: F401  (registers the periodic jobs)
+from . import api, auth, metrics, search
 from .db import Base, engine
+from .graph import friend_graph
+from .instrumentation import RequestTimingMiddleware
+from .middleware import CompressionMiddleware, ETagMiddleware, ReadYourWritesMiddleware
+from .scheduler import SCHEDULER_ENABLED, scheduler
 
 Base.metadata.create_all(bind=engine)
+with engine.begin() as conn:
+    search.install(conn)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # periodic jobs (jobs.py); one worker runs them, see scheduler.py
+    if SCHEDULER_ENABLED:
+        scheduler.start()
+    yield
+    await scheduler.stop()
+
 
 # Renamed API
-app = FastAPI(title="Aura API")
+app = FastAPI(title="Aura API", lifespan=lifespan)
 
 # DEV-ONLY CORS (allow everything). Note: allow_credentials must be False with "*"
 app.add_middleware(
@@ -16,8 +35,36 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
     allow_credentials=False,
+    # browsers hide non-safelisted headers otherwise: the inbox page cursor
+    # and the last-write time clients echo back (see ReadYourWritesMiddleware)
+    expose_headers=["X-Next-Cursor", "X-Last-Write"],
 )
 
+# reads right after a client's own write go to the primary, on any worker
+app.add_middleware(ReadYourWritesMiddleware)
+
+
+# ETag + 304 for GETs, then gzip/brotli (see middleware.py)
+app.add_middleware(ETagMiddleware)
+app.add_middleware(CompressionMiddleware)
+
+# Prometheus metrics (latency per route, in-flight, pool, caches, ...)
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Query count / timing per request (Server-Timing header + aura.requests log)
+app.add_middleware(RequestTimingMiddleware)
+
+metrics.watch_cache("auth_token", auth.token_cache)
+metrics.watch_cache("auth_user", auth.user_cache)
+metrics.watch_cache("friend_graph", friend_graph.cache)
+metrics.watch_cache("friend_suggestions", friend_graph.scores)
+metrics.watch_cache("ics", api.ics_cache)
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE_LATEST)
+
 
 # Fallback for any OPTIONS (preflight) request
 @app.options("/{rest_of_path:path}")
@@ -0,0 +1,175 @@
+# backend/app/metrics.py
+"""Prometheus metrics, served at /metrics.
+
+Several uvicorn workers: point PROMETHEUS_MULTIPROC_DIR at an empty,
+writable directory (wipe it on deploy) before the app starts. Every worker
+then writes its samples there and /metrics, whichever worker answers it,
+reports the sum over all of them.
+
+Pool, cache and hashing gauges are sampled after every request and on
+scrape. Cache hit ratio in PromQL:
+    rate(aura_cache_hits_total[5m])
+      / (rate(aura_cache_hits_total[5m]) + rate(aura_cache_misses_total[5m]))
+"""
+import atexit
+import os
+import threading
+import time
+from typing import Dict
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from .cache import TTLCache
+from .instrumentation import current_stats, route_template
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+REQUEST_LATENCY = Histogram(
+    "aura_http_request_duration_seconds",
+    "Request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    "aura_http_request_db_queries",
+    "SQL statements per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+IN_FLIGHT = Gauge(
+    "aura_http_requests_in_flight",
+    "Requests being handled right now",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+POOL_SIZE = Gauge("aura_db_pool_size", "Pool size", multiprocess_mode="livesum")
+POOL_CHECKED_OUT = Gauge(
+    "aura_db_pool_checked_out",
+    "Connections checked out of the pool",
+    multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "aura_db_pool_overflow",
+    "Connections open beyond pool_size",
+    multiprocess_mode="livesum",
+)
+POOL_CHECKOUTS = Counter("aura_db_pool_checkouts", "Connection checkouts")
+POOL_WAIT = Counter(
+    "aura_db_pool_checkout_wait_seconds", "Time spent waiting for a connection"
+)
+POOL_TIMEOUTS = Counter("aura_db_pool_checkout_timeouts", "Checkouts that timed out")
+
+CACHE_HITS = Counter("aura_cache_hits", "Cache hits", ["cache"])
+CACHE_MISSES = Counter("aura_cache_misses", "Cache misses", ["cache"])
+CACHE_ENTRIES = Gauge(
+    "aura_cache_entries", "Entries in the cache", ["cache"], multiprocess_mode="livesum"
+)
+
+HASH_QUEUE_DEPTH = Gauge(
+    "aura_password_hash_queue_depth",
+    "bcrypt jobs running or waiting",
+    multiprocess_mode="livesum",
+)
+
+INVITES_CREATED = Counter("aura_invites_created", "Invites created")
+RSVPS = Counter("aura_rsvps", "RSVPs recorded", ["status"])
+
+# name -> TTLCache, see watch_cache()
+_caches: Dict[str, TTLCache] = {}
+# counters are cumulative per process: remember what was already reported
+_reported: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def watch_cache(name: str, cache: TTLCache) -> None:
+    _caches[name] = cache
+
+
+def _report(key: str, counter, total: float) -> None:
+    delta = total - _reported.get(key, 0)
+    if delta > 0:
+        counter.inc(delta)
+        _reported[key] = total
+
+
+def sample() -> None:
+    """Copy pool, cache and hashing state of this process into the gauges."""
+    # imported here: auth/db import nothing from this module, but api does
+    from .auth import hash_queue_depth
+    from .db import pool_stats
+
+    pool = pool_stats()
+    with _lock:
+        POOL_SIZE.set(pool.get("size", 0))
+        POOL_CHECKED_OUT.set(pool.get("checked_out", 0))
+        POOL_OVERFLOW.set(pool.get("overflow", 0))
+        _report("pool.checkouts", POOL_CHECKOUTS, pool["checkouts"])
+        _report("pool.wait", POOL_WAIT, pool["checkout_wait_seconds_total"])
+        _report("pool.timeouts", POOL_TIMEOUTS, pool["checkout_timeouts"])
+        for name, cache in _caches.items():
+            _report(f"{name}.hits", CACHE_HITS.labels(name), cache.hits)
+            _report(f"{name}.misses", CACHE_MISSES.labels(name), cache.misses)
+            CACHE_ENTRIES.labels(name).set(len(cache))
+        HASH_QUEUE_DEPTH.set(hash_queue_depth())
+
+
+def render() -> bytes:
+    sample()
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
+
+
+if MULTIPROC_DIR:
+    # drop this worker's live gauges (in-flight etc.) when it exits
+    atexit.register(multiprocess.mark_process_dead, os.getpid())
+
+
+class MetricsMiddleware:
+    """In-flight gauge, latency and query histograms per route template.
+
+    Runs inside RequestTimingMiddleware so the request's query count is
+    available from instrumentation.current_stats.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        IN_FLIGHT.labels(method).inc()
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            IN_FLIGHT.labels(method).dec()
+            route = route_template(scope) if "route" in scope else "unmatched"
+            REQUEST_LATENCY.labels(method, route, str(status["code"])).observe(
+                time.perf_counter() - started
+            )
+            stats = current_stats.get()
+            if stats is not None:
+                REQUEST_QUERIES.labels(method, route).observe(stats.queries)
+            sample()
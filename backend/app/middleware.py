@@ -0,0 +1,266 @@
+# backend/app/middleware.py
+"""Response compression and ETag/304 for GET endpoints.
+
+Both buffer complete (non-streaming) responses only; streamed bodies such
+as the SSE event stream and the calendar feed pass through untouched.
+
+ETagMiddleware hashes the body of every 200 GET response that has no ETag
+of its own and answers If-None-Match with 304, so clients re-polling an
+unchanged inbox get an empty response. The handler still runs: this saves
+bandwidth, not server work. Responses are marked private (they depend on
+the bearer token) and must be revalidated every time.
+
+CompressionMiddleware compresses bodies above COMPRESSION_MIN_SIZE with
+brotli (if the `brotli` package is installed) or gzip, whichever the
+client prefers.
+
+ReadYourWritesMiddleware carries the time of the client's last write in a
+short-lived cookie and the X-Last-Write header (clients without cookies
+echo the header back), so reads that follow a write stay on the primary
+database whichever worker serves them; see db.recently_wrote.
+"""
+import gzip
+import hashlib
+import os
+import time
+from http.cookies import CookieError, SimpleCookie
+from typing import Dict, List, Optional, Tuple
+
+from . import db
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+# encodings we offer, in order of preference ("" turns compression off)
+COMPRESSION_ENCODINGS = [
+    e.strip()
+    for e in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",")
+    if e.strip() in ("br", "gzip") and (e.strip() != "br" or brotli is not None)
+]
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "text/",
+    "application/javascript",
+    "application/xml",
+)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison (RFC 9110 13.1.2): W/"x" matches "x"."""
+    if not if_none_match:
+        return False
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _without(headers: List[Tuple[bytes, bytes]], *names: bytes) -> list:
+    return [(k, v) for k, v in headers if k.lower() not in names]
+
+
+def _request_header(scope, name: bytes) -> Optional[str]:
+    return _header(scope.get("headers", []), name)
+
+
+class _BufferedResponse:
+    """Collects start + body of a response, unless it turns out to stream.
+
+    `on_complete(start, body)` may rewrite a complete response before it is
+    sent; streamed responses are forwarded as they come.
+    """
+
+    def __init__(self, send, on_complete):
+        self.send = send
+        self.on_complete = on_complete
+        self.start = None
+        self.chunks: List[bytes] = []
+        self.streaming = False
+
+    async def __call__(self, message):
+        if self.streaming:
+            await self.send(message)
+        elif message["type"] == "http.response.start":
+            self.start = message
+        elif message["type"] == "http.response.body":
+            self.chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                # streaming response: give up buffering
+                self.streaming = True
+                await self.send(self.start)
+                body = b"".join(self.chunks)
+                await self.send(
+                    {"type": "http.response.body", "body": body, "more_body": True}
+                )
+                self.chunks = []
+            else:
+                start, body = self.on_complete(self.start, b"".join(self.chunks))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+        else:
+            await self.send(message)
+
+
+def _with_body(start, headers, body: bytes):
+    headers = _without(headers, b"content-length")
+    headers.append((b"content-length", str(len(body)).encode()))
+    return {**start, "headers": headers}, body
+
+
+class ETagMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        if_none_match = _request_header(scope, b"if-none-match")
+
+        def add_etag(start, body: bytes):
+            headers = list(start.get("headers", []))
+            if start["status"] != 200 or _header(headers, b"etag") is not None:
+                return start, body
+            cache_control = _header(headers, b"cache-control") or ""
+            if "no-store" in cache_control:
+                return start, body
+            etag = 'W/"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+            headers.append((b"etag", etag.encode()))
+            if not cache_control:
+                headers.append((b"cache-control", b"private, no-cache"))
+            if etag_matches(if_none_match, etag):
+                headers = _without(headers, b"content-type", b"content-length")
+                return {**start, "status": 304, "headers": headers}, b""
+            return {**start, "headers": headers}, body
+
+        await self.app(scope, receive, _BufferedResponse(send, add_etag))
+
+
+def _accepted_encodings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """Accept-Encoding -> {coding: q}, e.g. "gzip;q=0.5, br" -> both."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    accepted = _accepted_encodings(accept_encoding)
+    best, best_q = None, 0.0
+    for coding in COMPRESSION_ENCODINGS:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENCODINGS:
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(_request_header(scope, b"accept-encoding"))
+
+        def maybe_compress(start, body: bytes):
+            headers = list(start.get("headers", []))
+            content_type = _header(headers, b"content-type") or ""
+            if not content_type.startswith(COMPRESSIBLE_TYPES):
+                return start, body
+            vary = _header(headers, b"vary")
+            if not vary or "accept-encoding" not in vary.lower():
+                headers = _without(headers, b"vary")
+                vary = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+                headers.append((b"vary", vary.encode()))
+            if (
+                encoding is None
+                or len(body) < self.minimum_size
+                or _header(headers, b"content-encoding") is not None
+            ):
+                return {**start, "headers": headers}, body
+            headers.append((b"content-encoding", encoding.encode()))
+            return _with_body(start, headers, compress(body, encoding))
+
+        await self.app(scope, receive, _BufferedResponse(send, maybe_compress))
+
+
+WRITE_COOKIE = "aura_wrote"
+
+
+def _client_write_time(scope) -> Optional[float]:
+    """Last write time the client sent back (header first, then cookie)."""
+    value = _request_header(scope, b"x-last-write")
+    if value is None:
+        try:
+            cookie = SimpleCookie(_request_header(scope, b"cookie") or "")
+        except CookieError:
+            cookie = {}
+        value = cookie[WRITE_COOKIE].value if WRITE_COOKIE in cookie else None
+    try:
+        return min(float(value), time.time()) if value else None
+    except ValueError:
+        return None
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        mark = db.WriteMark(_client_write_time(scope))
+        token = db.last_write.set(mark)
+
+        async def send_with_mark(message):
+            if (
+                message["type"] == "http.response.start"
+                and mark.wrote
+                and db.RoutingSession.replicas
+            ):
+                stamp = b"%.3f" % mark.wrote_at
+                max_age = int(db.REPLICA_STICKY_SECONDS) + 1
+                cookie = b"%s=%s; Max-Age=%d; Path=/; HttpOnly; SameSite=Lax" % (
+                    WRITE_COOKIE.encode(),
+                    stamp,
+                    max_age,
+                )
+                headers = list(message.get("headers", []))
+                headers += [(b"x-last-write", stamp), (b"set-cookie", cookie)]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_mark)
+        finally:
+            db.last_write.reset(token)
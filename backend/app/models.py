@@ -2,17 +2,20 @@
 import enum
 import secrets
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
 
 from sqlalchemy import (
+    CheckConstraint,
     Column,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
+    text,
 )
 
 from .db import Base
@@ -46,6 +49,26 @@ class AuraStatus(str, enum.Enum):
     closed = "closed"
 
 
+class ReminderStatus(str, enum.Enum):
+    pending = "pending"
+    sending = "sending"  # claimed by a worker until locked_until
+    sent = "sent"
+    failed = "failed"  # gave up after REMINDER_MAX_ATTEMPTS
+    cancelled = "cancelled"
+
+
+def activity_label(
+    activity_type: Optional[str], custom_label: Optional[str]
+) -> Optional[str]:
+    if activity_type == "CUSTOM":
+        return (custom_label or "").strip() or None
+
+    if activity_type in PRESET_ACTIVITIES:
+        return PRESET_ACTIVITIES[activity_type]
+
+    return None
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -58,12 +81,25 @@ class User(Base):
 
 
 class Friendship(Base):
+    """One row per unordered pair, stored as (low_id, high_id)."""
+
     __tablename__ = "friendships"
 
-    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
-    friend_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    low_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    high_id = Column(Integer, ForeignKey("users.id"), primary_key=True, index=True)
+    # who sent the request; NULL for legacy rows migrated from mirrored storage
+    requester_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     status = Column(Enum(FriendshipStatus), default=FriendshipStatus.pending)
 
+    __table_args__ = (CheckConstraint("low_id < high_id", name="ck_friendship_order"),)
+
+    @staticmethod
+    def pair(a: int, b: int) -> Tuple[int, int]:
+        return (a, b) if a < b else (b, a)
+
+    def other(self, user_id: int) -> int:
+        return self.high_id if self.low_id == user_id else self.low_id
+
 
 # ⚠️ Keep the CLASS name Ping because api.py uses models.Ping
 class Ping(Base):
@@ -80,6 +116,11 @@ class Ping(Base):
         String, default=lambda: secrets.token_urlsafe(16), nullable=False
     )
     created_at = Column(DateTime, default=datetime.utcnow)
+    # change tracking for /pings/changes (bumped on edits and RSVPs)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
+    )
+    version = Column(Integer, default=1, nullable=False)
 
     # NEW: structured “vibe”
     activity_type = Column(String, nullable=True)  # e.g. "DRINK", "GYM", "CUSTOM"
@@ -88,13 +129,23 @@ class Ping(Base):
     @property
     def activity_label(self) -> Optional[str]:
         """Human-friendly label that frontend can visa direkt."""
-        if self.activity_type == "CUSTOM":
-            return (self.activity_custom_label or "").strip() or None
+        return activity_label(self.activity_type, self.activity_custom_label)
+
+    __table_args__ = (
+        Index("ix_auras_creator_starts", "creator_id", "starts_at"),
+        # hot queries only look at open auras; closed ones stay out of this index
+        Index(
+            "ix_auras_open_starts",
+            "starts_at",
+            sqlite_where=text("status = 'open'"),
+            postgresql_where=text("status = 'open'"),
+        ),
+    )
 
-        if self.activity_type in PRESET_ACTIVITIES:
-            return PRESET_ACTIVITIES[self.activity_type]
 
-        return None
+# Filter for open auras. Written as literal SQL: with a bound parameter the
+# planner can't tell that ix_auras_open_starts applies.
+AURA_IS_OPEN = text("auras.status = 'open'")
 
 
 class PingInvite(Base):
@@ -105,7 +156,91 @@ class PingInvite(Base):
     invitee_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
     status = Column(Enum(InviteStatus), default=InviteStatus.pending)
     responded_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = Column(Integer, default=1, nullable=False)
 
     __table_args__ = (
         UniqueConstraint("ping_id", "invitee_id", name="uniq_ping_invitee"),
+        # inbox: EXISTS lookup by invitee, skipping declined
+        Index("ix_invites_invitee_status_ping", "invitee_id", "status", "ping_id"),
     )
+
+
+# -------- Archive --------
+# Closed auras older than ARCHIVE_AFTER_DAYS are moved here with their
+# invites (jobs.archive_old_auras); same columns, ids are kept.
+
+
+class ArchivedPing(Base):
+    __tablename__ = "auras_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    creator_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    title = Column(String)
+    starts_at = Column(DateTime, nullable=False)
+    location = Column(String, nullable=False)
+    notes = Column(Text, nullable=True)
+    status = Column(Enum(AuraStatus))
+    ics_secret = Column(String, nullable=False)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    version = Column(Integer, nullable=False)
+    activity_type = Column(String, nullable=True)
+    activity_custom_label = Column(String, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    @property
+    def activity_label(self) -> Optional[str]:
+        return activity_label(self.activity_type, self.activity_custom_label)
+
+
+class ArchivedPingInvite(Base):
+    __tablename__ = "aura_invites_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    ping_id = Column(
+        Integer, ForeignKey("auras_archive.id"), index=True, nullable=False
+    )
+    invitee_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    status = Column(Enum(InviteStatus))
+    responded_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime)
+    version = Column(Integer, nullable=False)
+
+
+class ReminderJob(Base):
+    """Queued notification for one user about one aura (see reminders.py)."""
+
+    __tablename__ = "reminder_jobs"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # no FK: the aura may be archived while old jobs are still around
+    ping_id = Column(Integer, nullable=False, index=True)
+    kind = Column(String, nullable=False, default="aura.reminder")
+    run_at = Column(DateTime, nullable=False)
+    status = Column(
+        Enum(ReminderStatus), nullable=False, default=ReminderStatus.pending
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    locked_by = Column(String, nullable=True, index=True)
+    locked_until = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "ping_id", "kind", name="uniq_reminder"),
+        # worker: due jobs in run_at order
+        Index("ix_reminders_status_run_at", "status", "run_at"),
+    )
+
+
+class JobLease(Base):
+    """Leader lease for the scheduler: whoever holds an unexpired row runs jobs."""
+
+    __tablename__ = "job_leases"
+
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
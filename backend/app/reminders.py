@@ -0,0 +1,326 @@
+# backend/app/reminders.py
+"""Reminders before an aura starts, delivered off the request path.
+
+Request handlers only write rows to `reminder_jobs`, in the transaction
+they already commit: create_ping and add_invitees schedule a reminder for
+everybody involved, declining cancels it, accepting again restores it.
+deliver_due() runs as a scheduler job (or in a dedicated worker,
+`python -m app.reminders`) and does the actual sending:
+
+- due rows are claimed in batches: UPDATE ... WHERE id IN (SELECT ... FOR
+  UPDATE SKIP LOCKED) on Postgres, so several workers never claim the same
+  row. SQLite has no row locks, but the UPDATE runs under its database
+  write lock, which gives the same guarantee.
+- a user's reminders due within REMINDER_COALESCE_SECONDS go out as one
+  notification.
+- failures are retried with exponential backoff, up to
+  REMINDER_MAX_ATTEMPTS. Rows of a crashed worker are claimed again after
+  locked_until.
+
+The sender is pluggable (REMINDER_SENDER): "log" (local stub, default),
+"events" (SSE push via events.publish) or "package.module:factory".
+"""
+import importlib
+import logging
+import os
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from . import events, models
+from .db import SessionLocal, conflict_insert
+
+logger = logging.getLogger("aura.reminders")
+
+REMINDER_KIND = "aura.reminder"
+REMINDER_LEAD = timedelta(minutes=float(os.getenv("REMINDER_LEAD_MINUTES", "60")))
+REMINDER_BATCH = int(os.getenv("REMINDER_BATCH", "200"))
+REMINDER_MAX_BATCHES = int(os.getenv("REMINDER_MAX_BATCHES", "10"))
+REMINDER_COALESCE = timedelta(
+    seconds=float(os.getenv("REMINDER_COALESCE_SECONDS", "300"))
+)
+REMINDER_MAX_ATTEMPTS = int(os.getenv("REMINDER_MAX_ATTEMPTS", "5"))
+REMINDER_BACKOFF_SECONDS = float(os.getenv("REMINDER_BACKOFF_SECONDS", "30"))
+REMINDER_BACKOFF_MAX_SECONDS = float(os.getenv("REMINDER_BACKOFF_MAX_SECONDS", "3600"))
+REMINDER_LOCK_SECONDS = float(os.getenv("REMINDER_LOCK_SECONDS", "120"))
+REMINDER_INTERVAL = float(os.getenv("REMINDER_INTERVAL_SECONDS", "30"))
+REMINDER_SENDER = os.getenv("REMINDER_SENDER", "log")
+
+Job = models.ReminderJob
+Status = models.ReminderStatus
+
+
+class Reminder(NamedTuple):
+    ping_id: int
+    title: str
+    starts_at: datetime
+    location: str
+
+
+# -------- Senders --------
+
+
+class LogSender:
+    """Local stub: logs instead of sending."""
+
+    def send(self, user_id: int, reminders: List[Reminder]) -> None:
+        logger.info(
+            "reminder for user %s: %s",
+            user_id,
+            ", ".join(f"{r.title} at {r.starts_at:%Y-%m-%d %H:%M}" for r in reminders),
+        )
+
+
+class EventsSender:
+    """Push to connected clients (SSE), same channel as invites and RSVPs."""
+
+    def send(self, user_id: int, reminders: List[Reminder]) -> None:
+        events.publish(
+            user_id,
+            REMINDER_KIND,
+            auras=[
+                {
+                    "ping_id": r.ping_id,
+                    "title": r.title,
+                    "starts_at": r.starts_at.isoformat(),
+                    "location": r.location,
+                }
+                for r in reminders
+            ],
+        )
+
+
+def load_sender(spec: str):
+    if spec == "log":
+        return LogSender()
+    if spec == "events":
+        return EventsSender()
+    module, _, attr = spec.partition(":")
+    obj = getattr(importlib.import_module(module), attr)
+    return obj if hasattr(obj, "send") and not isinstance(obj, type) else obj()
+
+
+sender = load_sender(REMINDER_SENDER)
+
+
+# -------- Scheduling (request path: one statement, no sending) --------
+
+
+def schedule(
+    db: Session, entries: Iterable[Tuple[int, datetime, int]], now=None
+) -> None:
+    """Queue (or re-arm) reminders for (ping_id, starts_at, user_id) entries.
+
+    Caller commits. Auras starting within REMINDER_LEAD get no reminder (the
+    invite itself is the notification); reminders already sent stay sent.
+    """
+    now = now or datetime.utcnow()
+    rows = {}
+    for ping_id, starts_at, user_id in entries:
+        run_at = starts_at.replace(tzinfo=None) - REMINDER_LEAD
+        if run_at > now:
+            rows[(user_id, ping_id)] = {
+                "user_id": user_id,
+                "ping_id": ping_id,
+                "kind": REMINDER_KIND,
+                "run_at": run_at,
+                "status": Status.pending,
+                "attempts": 0,
+            }
+    if not rows:
+        return
+    stmt = conflict_insert(db, Job)
+    if stmt is not None:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "ping_id", "kind"],
+            set_={
+                "run_at": stmt.excluded.run_at,
+                "status": stmt.excluded.status,
+                "attempts": 0,
+                "last_error": None,
+            },
+            where=Job.status != Status.sent,
+        )
+        db.execute(stmt, list(rows.values()))
+        return
+
+    for row in rows.values():
+        job = (
+            db.query(Job)
+            .filter_by(
+                user_id=row["user_id"], ping_id=row["ping_id"], kind=REMINDER_KIND
+            )
+            .first()
+        )
+        if job is None:
+            db.add(Job(**row))
+        elif job.status != Status.sent:
+            job.run_at, job.status, job.attempts = row["run_at"], Status.pending, 0
+
+
+def cancel(db: Session, user_id: int, ping_ids: Iterable[int]) -> None:
+    """Drop a user's pending reminders (they declined). Caller commits."""
+    db.query(Job).filter(
+        Job.user_id == user_id,
+        Job.ping_id.in_(list(ping_ids)),
+        Job.status == Status.pending,
+    ).update({Job.status: Status.cancelled}, synchronize_session=False)
+
+
+# -------- Delivery (scheduler / worker) --------
+
+
+def _claim(db: Session, token: str, where, now: datetime, limit: int) -> int:
+    ids = (
+        select(Job.id)
+        .where(where)
+        .order_by(Job.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        db.query(Job)
+        .filter(Job.id.in_(ids.scalar_subquery()))
+        .update(
+            {
+                Job.status: Status.sending,
+                Job.locked_by: token,
+                Job.locked_until: now + timedelta(seconds=REMINDER_LOCK_SECONDS),
+                Job.attempts: Job.attempts + 1,
+            },
+            synchronize_session=False,
+        )
+    )
+
+
+def claim_batch(db: Session, now: datetime, limit: int) -> str:
+    """Claim due jobs plus the same users' jobs due soon; returns the token."""
+    token = uuid.uuid4().hex
+    due = or_(
+        and_(Job.status == Status.pending, Job.run_at <= now),
+        and_(Job.status == Status.sending, Job.locked_until < now),
+    )
+    if _claim(db, token, due, now, limit):
+        users = select(Job.user_id).where(Job.locked_by == token)
+        soon = and_(
+            Job.status == Status.pending,
+            Job.run_at <= now + REMINDER_COALESCE,
+            Job.user_id.in_(users.scalar_subquery()),
+        )
+        _claim(db, token, soon, now, limit)
+    db.commit()
+    return token
+
+
+def _backoff(attempts: int) -> timedelta:
+    seconds = REMINDER_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, REMINDER_BACKOFF_MAX_SECONDS))
+
+
+def deliver_due(
+    db: Session,
+    now: Optional[datetime] = None,
+    batch_size: int = REMINDER_BATCH,
+    max_batches: int = REMINDER_MAX_BATCHES,
+    send=None,
+) -> int:
+    """Send due reminders, one call per user. Returns jobs handled."""
+    send = send or sender
+    handled = 0
+    for _ in range(max_batches):
+        now_ = now or datetime.utcnow()
+        token = claim_batch(db, now_, batch_size)
+        rows = (
+            db.query(Job, models.Ping, models.PingInvite.status)
+            .outerjoin(models.Ping, models.Ping.id == Job.ping_id)
+            .outerjoin(
+                models.PingInvite,
+                and_(
+                    models.PingInvite.ping_id == Job.ping_id,
+                    models.PingInvite.invitee_id == Job.user_id,
+                ),
+            )
+            .filter(Job.locked_by == token, Job.status == Status.sending)
+            .all()
+        )
+        if not rows:
+            break
+
+        by_user: Dict[int, List] = defaultdict(list)
+        stale = []
+        for job, ping, invite_status in rows:
+            if (
+                ping is None
+                or ping.status != models.AuraStatus.open
+                or ping.starts_at <= now_
+                or invite_status == models.InviteStatus.declined
+            ):
+                stale.append(job.id)
+            else:
+                by_user[job.user_id].append((job, ping))
+
+        outcome = {Status.sent: [], Status.pending: [], Status.failed: []}
+        errors = {}
+        for user_id, items in by_user.items():
+            reminders = [
+                Reminder(p.id, p.title, p.starts_at, p.location) for _, p in items
+            ]
+            try:
+                send.send(user_id, sorted(reminders, key=lambda r: r.starts_at))
+            except Exception as exc:
+                logger.warning("reminder to user %s failed: %s", user_id, exc)
+                for job, _ in items:
+                    errors[job.id] = repr(exc)[:500]
+                    if job.attempts >= REMINDER_MAX_ATTEMPTS:
+                        outcome[Status.failed].append(job)
+                    else:
+                        outcome[Status.pending].append(job)
+            else:
+                outcome[Status.sent].extend(job for job, _ in items)
+
+        released = {Job.locked_by: None, Job.locked_until: None}
+        if stale:
+            db.query(Job).filter(Job.id.in_(stale)).update(
+                {Job.status: Status.cancelled, **released}, synchronize_session=False
+            )
+        if outcome[Status.sent]:
+            db.query(Job).filter(
+                Job.id.in_([j.id for j in outcome[Status.sent]])
+            ).update(
+                {Job.status: Status.sent, Job.sent_at: now_, **released},
+                synchronize_session=False,
+            )
+        for job in outcome[Status.pending] + outcome[Status.failed]:
+            failed = job in outcome[Status.failed]
+            job.status = Status.failed if failed else Status.pending
+            job.run_at = job.run_at if failed else now_ + _backoff(job.attempts)
+            job.last_error = errors[job.id]
+            job.locked_by = job.locked_until = None
+        db.commit()
+
+        handled += len(rows)
+        if len(rows) < batch_size:
+            break
+    return handled
+
+
+def run_worker(interval: float = REMINDER_INTERVAL) -> None:
+    """Dedicated delivery loop, for running outside the API workers."""
+    while True:
+        with SessionLocal() as db:
+            try:
+                deliver_due(db)
+            except Exception:
+                db.rollback()
+                logger.exception("reminder delivery failed")
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_worker()
@@ -0,0 +1,152 @@
+# backend/app/scheduler.py
+"""In-process periodic jobs, run by one worker at a time.
+
+Every uvicorn worker starts a Scheduler from the app lifespan. Each tick the
+worker tries to take (or renew) the lease row in `job_leases`; only the
+holder runs jobs, so with N workers a job still runs once per interval. If
+the leader dies its lease expires after LEASE_SECONDS and another worker
+takes over.
+
+Jobs are plain functions taking a Session. They run in a thread (the sync
+engine is used in both DB modes) and should commit in small batches.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+from .db import SessionLocal
+
+logger = logging.getLogger("aura.scheduler")
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "1").lower() in ("1", "true", "yes")
+TICK_SECONDS = float(os.getenv("SCHEDULER_TICK_SECONDS", "30"))
+LEASE_SECONDS = float(os.getenv("SCHEDULER_LEASE_SECONDS", str(TICK_SECONDS * 3)))
+LEASE_NAME = "scheduler"
+
+
+@dataclass
+class Job:
+    name: str
+    interval: float  # seconds
+    fn: Callable[[Session], Optional[int]]
+    last_run: float = 0.0  # time.monotonic()
+
+
+class Scheduler:
+    def __init__(
+        self, tick: float = TICK_SECONDS, lease_seconds: float = LEASE_SECONDS
+    ):
+        self.tick = tick
+        self.lease_seconds = lease_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.jobs: List[Job] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def add_job(self, name: str, interval: float, fn) -> None:
+        self.jobs.append(Job(name, interval, fn))
+
+    # -- leader election --
+
+    def acquire_lease(self, db: Session) -> bool:
+        """Take or renew the lease; True if this worker is the leader now."""
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        lease = models.JobLease
+        renewed = (
+            db.query(lease)
+            .filter(
+                lease.name == LEASE_NAME,
+                (lease.holder == self.holder) | (lease.expires_at < now),
+            )
+            .update(
+                {lease.holder: self.holder, lease.expires_at: expires_at},
+                synchronize_session=False,
+            )
+        )
+        if renewed:
+            db.commit()
+            return True
+        try:
+            db.add(lease(name=LEASE_NAME, holder=self.holder, expires_at=expires_at))
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()  # someone else holds it
+            return False
+
+    def release_lease(self, db: Session) -> None:
+        db.query(models.JobLease).filter(
+            models.JobLease.name == LEASE_NAME,
+            models.JobLease.holder == self.holder,
+        ).delete(synchronize_session=False)
+        db.commit()
+
+    def _release(self) -> None:
+        with SessionLocal() as db:
+            self.release_lease(db)
+
+    # -- running --
+
+    def run_due(self, force: bool = False) -> dict:
+        """One tick: if leader, run every job whose interval has passed.
+
+        Returns {job name: result} for the jobs that ran.
+        """
+        ran = {}
+        with SessionLocal() as db:
+            if not self.acquire_lease(db):
+                return ran
+        for job in self.jobs:
+            now = time.monotonic()
+            if not force and job.last_run and now - job.last_run < job.interval:
+                continue
+            job.last_run = now
+            with SessionLocal() as db:
+                try:
+                    ran[job.name] = job.fn(db)
+                except Exception:
+                    db.rollback()
+                    logger.exception("job %s failed", job.name)
+                    continue
+            if ran[job.name]:
+                logger.info("job %s: %s", job.name, ran[job.name])
+        return ran
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick)
+            try:
+                await asyncio.to_thread(self.run_due)
+            except Exception:
+                logger.exception("scheduler tick failed")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            await asyncio.to_thread(self._release)
+        except Exception:
+            logger.exception("could not release scheduler lease")
+
+
+scheduler = Scheduler()
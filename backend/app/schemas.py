@@ -3,11 +3,11 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List, Literal, Optional
 
-from pydantic import BaseModel, EmailStr, field_validator, model_validator
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
 
+from .availability import naive_utc
 from .models import PRESET_ACTIVITIES
 
-
 # Typalias för vilka aktiviteter som är tillåtna
 ActivityType = Literal[
     "DRINK",
@@ -50,6 +50,12 @@ class UserOut(BaseModel):
         from_attributes = True  # Pydantic v2 (orm_mode replacement)
 
 
+# -------- Friends --------
+class FriendSuggestionOut(BaseModel):
+    user: UserOut
+    mutual_count: int
+
+
 # -------- Invites --------
 class InviteOut(BaseModel):
     user: UserOut
@@ -137,6 +143,7 @@ class PingOut(BaseModel):
     creator: UserOut
     invites: List[InviteOut]
     ics_public_url: str
+    version: int = 1
 
     # NYTT: skickas ut till frontend (activity_label kommer från models.Ping @property)
     activity_type: Optional[ActivityType] = None
@@ -147,6 +154,86 @@ class PingOut(BaseModel):
         from_attributes = True
 
 
+class CalendarFeedOut(BaseModel):
+    url: str
+
+
+class PingChangesOut(BaseModel):
+    changed: List[PingOut]
+    removed: List[int]  # aura ids to drop client-side
+    cursor: str  # pass back as ?since= on the next poll
+    has_more: bool
+
+
 # -------- Respond --------
 class RespondIn(BaseModel):
     status: Literal["pending", "accepted", "declined", "maybe"]
+
+
+class RespondBatchItem(RespondIn):
+    ping_id: int
+
+
+class RespondBatchIn(BaseModel):
+    items: List[RespondBatchItem] = Field(..., min_length=1, max_length=200)
+
+
+class RespondResult(BaseModel):
+    ping_id: int
+    ok: bool
+    error: Optional[str] = None  # "no_invite"
+
+
+class RespondBatchOut(BaseModel):
+    results: List[RespondResult]
+
+
+# -------- Suggest times --------
+class SuggestTimesIn(BaseModel):
+    invitee_ids: List[int] = Field(..., min_length=1, max_length=50)
+    window_start: datetime
+    window_end: datetime
+    duration_minutes: int = Field(120, ge=15, le=12 * 60)
+    step_minutes: int = Field(30, ge=5, le=24 * 60)
+    limit: int = Field(5, ge=1, le=20)
+    # waking hours, in each participant's own timezone
+    day_start_hour: int = Field(8, ge=0, le=23)
+    day_end_hour: int = Field(23, ge=1, le=24)
+
+    @model_validator(mode="after")
+    def validate_window(self) -> "SuggestTimesIn":
+        # naive UTC, like the database; also lets aware and naive inputs mix
+        self.window_start = naive_utc(self.window_start)
+        self.window_end = naive_utc(self.window_end)
+        if self.window_end <= self.window_start:
+            raise ValueError("window_end must be after window_start")
+        if self.day_end_hour <= self.day_start_hour:
+            raise ValueError("day_end_hour must be after day_start_hour")
+        return self
+
+
+class TimeSlotOut(BaseModel):
+    starts_at: datetime
+    ends_at: datetime
+    available_ids: List[int]
+    busy_ids: List[int]
+
+
+class SuggestTimesOut(BaseModel):
+    participants: int
+    slots: List[TimeSlotOut]
+
+
+# -------- Invitees --------
+class InviteesIn(BaseModel):
+    invitee_ids: List[int] = Field(..., min_length=1, max_length=200)
+
+
+class InviteeResult(BaseModel):
+    user_id: int
+    ok: bool
+    error: Optional[str] = None  # "self" | "not_friend" | "already_invited"
+
+
+class InviteesOut(BaseModel):
+    results: List[InviteeResult]
@@ -0,0 +1,140 @@
+# backend/app/search.py
+"""User search backed by a real index instead of ILIKE '%q%' scans.
+
+SQLite:   FTS5 table `users_fts` (external content on `users`, prefix
+          indexes), kept in sync by triggers so register needs no extra code.
+Postgres: pg_trgm GIN indexes on lower(name) / lower(email).
+Anything else falls back to ILIKE.
+
+Results are ranked friends first, then friends-of-friends, then by text rank.
+"""
+import re
+from typing import List
+
+from sqlalchemy import case, column, event, func, or_, select, table, union_all
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from . import models
+from .graph import friend_ids_select
+
+SEARCH_LIMIT = 25
+
+users_fts = table("users_fts", column("rowid"), column("rank"), column("users_fts"))
+
+_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+    "name, email, content='users', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email);"
+    " END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name, email) "
+    "VALUES ('delete', old.id, old.name, old.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name, email) "
+    "VALUES ('delete', old.id, old.name, old.email); "
+    "INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email);"
+    " END",
+]
+
+_POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_users_name_trgm "
+    "ON users USING gin (lower(name) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_email_trgm "
+    "ON users USING gin (lower(email) gin_trgm_ops)",
+]
+
+# dialect name -> index is installed
+_installed = {}
+
+
+def install(connection) -> None:
+    """Create the search index for this database (idempotent)."""
+    dialect = connection.dialect.name
+    try:
+        if dialect == "sqlite":
+            existed = connection.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE name = 'users_fts'"
+            ).first()
+            for stmt in _SQLITE_DDL:
+                connection.exec_driver_sql(stmt)
+            if not existed:
+                # backfill users that existed before the index did
+                connection.exec_driver_sql(
+                    "INSERT INTO users_fts(users_fts) VALUES ('rebuild')"
+                )
+        elif dialect == "postgresql":
+            for stmt in _POSTGRES_DDL:
+                connection.exec_driver_sql(stmt)
+        else:
+            return
+    except OperationalError:
+        # e.g. SQLite built without FTS5: keep the ILIKE fallback
+        _installed[dialect] = False
+        return
+    _installed[dialect] = True
+
+
+@event.listens_for(models.User.__table__, "after_create")
+def _after_users_create(target, connection, **kw) -> None:
+    install(connection)
+
+
+@event.listens_for(models.User.__table__, "before_drop")
+def _before_users_drop(target, connection, **kw) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS users_fts")
+
+
+def _fts_query(q: str) -> str:
+    # every word must match as a prefix: "ann sv" -> "ann"* "sv"*
+    return " ".join(f'"{t}"*' for t in re.findall(r"\w+", q.lower()))
+
+
+def _social_rank(user_id: int):
+    """0 = friend, 1 = friend of a friend, 2 = everyone else."""
+    f = models.Friendship
+    accepted = models.FriendshipStatus.accepted
+    friend_ids = friend_ids_select(user_id)
+    fof_ids = union_all(
+        select(f.high_id).where(f.low_id.in_(friend_ids), f.status == accepted),
+        select(f.low_id).where(f.high_id.in_(friend_ids), f.status == accepted),
+    )
+    return case(
+        (models.User.id.in_(friend_ids), 0),
+        (models.User.id.in_(fof_ids), 1),
+        else_=2,
+    )
+
+
+def search_users(db: Session, me_id: int, q: str) -> List[models.User]:
+    dialect = db.get_bind().dialect.name
+    base = db.query(models.User).filter(models.User.id != me_id)
+    rank = _social_rank(me_id)
+
+    if dialect == "sqlite" and _installed.get("sqlite"):
+        match = _fts_query(q)
+        if not match:
+            return []
+        return (
+            base.join(users_fts, users_fts.c.rowid == models.User.id)
+            .filter(users_fts.c.users_fts.op("MATCH")(match))
+            .order_by(rank, users_fts.c.rank, models.User.id)
+            .limit(SEARCH_LIMIT)
+            .all()
+        )
+
+    needle = q.lower()
+    like = "%" + re.sub(r"([\\%_])", r"\\\1", needle) + "%"
+    name, email = func.lower(models.User.name), func.lower(models.User.email)
+    base = base.filter(or_(name.like(like, escape="\\"), email.like(like, escape="\\")))
+
+    if dialect == "postgresql" and _installed.get("postgresql"):
+        similarity = func.greatest(
+            func.similarity(name, needle), func.similarity(email, needle)
+        )
+        return base.order_by(rank, similarity.desc()).limit(SEARCH_LIMIT).all()
+
+    return base.order_by(rank, models.User.id).limit(SEARCH_LIMIT).all()
@@ -0,0 +1,328 @@
+# backend/bench/run.py
+"""Benchmark the hot API endpoints against a seeded synthetic graph.
+
+In-process (FastAPI TestClient, no network):
+    python -m bench.run --users 2000 --requests 500
+
+Over HTTP against a running server. The server must use the same database
+and JWT_SECRET; the database is reseeded first, so restart the server to
+drop its caches:
+    DATABASE_URL=sqlite:///./bench.sqlite3 uvicorn app.main:app --workers 4
+    python -m bench.run --url http://localhost:8000 --concurrency 16
+
+Results go to a JSON file; pass --baseline old.json to print the change
+per scenario against an earlier run.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_DATABASE_URL = "sqlite:///./bench.sqlite3"
+
+
+class World:
+    """Seeded data plus a token per user, shared by the scenarios."""
+
+    def __init__(self, seeded):
+        from app.auth import make_token
+
+        self.seeded = seeded
+        self.users = [u for u, f in seeded.friends.items() if f]
+        self.inviters = sorted(seeded.invites)
+        self._make_token = make_token
+        self._tokens: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def headers(self, user_id: int) -> dict:
+        with self._lock:
+            token = self._tokens.get(user_id)
+            if token is None:
+                token = self._tokens[user_id] = self._make_token(user_id)
+        return {"Authorization": f"Bearer {token}"}
+
+
+def inbox(client, world: World, rng: random.Random):
+    return client.get(
+        "/api/pings/inbox", headers=world.headers(rng.choice(world.users))
+    )
+
+
+def friends(client, world: World, rng: random.Random):
+    return client.get("/api/friends", headers=world.headers(rng.choice(world.users)))
+
+
+def suggestions(client, world: World, rng: random.Random):
+    return client.get(
+        "/api/friends/suggestions", headers=world.headers(rng.choice(world.users))
+    )
+
+
+def mutual(client, world: World, rng: random.Random):
+    user_id, other = rng.sample(world.users, 2)
+    return client.get(f"/api/users/{other}/mutual", headers=world.headers(user_id))
+
+
+def search(client, world: World, rng: random.Random):
+    user_id = rng.choice(world.users)
+    q = rng.choice(world.seeded.names)[: rng.randint(2, 5)]
+    return client.get(
+        "/api/users/search", params={"q": q}, headers=world.headers(user_id)
+    )
+
+
+def create_ping(client, world: World, rng: random.Random):
+    user_id = rng.choice(world.users)
+    pool = world.seeded.friends[user_id]
+    starts_at = datetime.now(timezone.utc) + timedelta(hours=rng.randint(1, 24 * 30))
+    return client.post(
+        "/api/pings",
+        headers=world.headers(user_id),
+        json={
+            "title": "Bench",
+            "location": "Stockholm",
+            "starts_at": starts_at.isoformat(),
+            "invitee_ids": rng.sample(pool, min(len(pool), 5)),
+        },
+    )
+
+
+def respond(client, world: World, rng: random.Random):
+    user_id = rng.choice(world.inviters)
+    ping_id = rng.choice(world.seeded.invites[user_id])
+    return client.post(
+        f"/api/pings/{ping_id}/respond",
+        headers=world.headers(user_id),
+        json={"status": rng.choice(["accepted", "declined", "maybe"])},
+    )
+
+
+def ics_public(client, world: World, rng: random.Random):
+    ping_id = rng.choice(list(world.seeded.auras))
+    _, secret = world.seeded.auras[ping_id]
+    return client.get(f"/api/pings/{ping_id}/ics-public", params={"sig": secret})
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "inbox": inbox,
+    "friends": friends,
+    "suggestions": suggestions,
+    "mutual": mutual,
+    "search": search,
+    "create_ping": create_ping,
+    "respond": respond,
+    "ics_public": ics_public,
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+def run_scenario(
+    client,
+    world: World,
+    fn: Callable,
+    requests: int,
+    concurrency: int = 1,
+    warmup: int = 10,
+    seed: int = 1,
+) -> dict:
+    rng = random.Random(seed)
+    for _ in range(warmup):
+        fn(client, world, rng)
+
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        nonlocal errors
+        local_rng = random.Random(seed * 1_000_003 + i)
+        started = time.perf_counter()
+        resp = fn(client, world, local_rng)
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if "x-query-count" in resp.headers:
+                queries.append(int(resp.headers["x-query-count"]))
+            if resp.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    if concurrency <= 1:
+        for i in range(requests):
+            one(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [v * 1000 for v in latencies]
+    return {
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(wall, 4),
+        "rps": round(requests / wall, 2) if wall else 0.0,
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "queries_mean": round(sum(queries) / len(queries), 2) if queries else None,
+        "queries_max": max(queries) if queries else None,
+    }
+
+
+def compare(current: dict, baseline: dict) -> List[str]:
+    """One line per scenario: metric now, and change vs the baseline in %."""
+    lines = []
+    for name, now in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        parts = []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms", "queries_mean"):
+            value = now.get(key)
+            old = before.get(key) if before else None
+            if value is None:
+                continue
+            if old:
+                parts.append(f"{key}={value} ({(value - old) / old * 100:+.1f}%)")
+            else:
+                parts.append(f"{key}={value}")
+        lines.append(f"{name:12} " + "  ".join(parts))
+    return lines
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--url", help="benchmark a running server instead of in-process")
+    p.add_argument(
+        "--database-url",
+        default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL),
+        help="database to (re)seed; SQLite or Postgres",
+    )
+    p.add_argument("--users", type=int, default=500)
+    p.add_argument("--degree", type=int, default=20, help="friends per user")
+    p.add_argument("--auras", type=int, default=4, help="auras per user")
+    p.add_argument("--invites", type=int, default=6, help="invites per aura")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--requests", type=int, default=200, help="per scenario")
+    p.add_argument("--warmup", type=int, default=10)
+    p.add_argument("--concurrency", type=int, default=1)
+    p.add_argument("--scenarios", default=",".join(SCENARIOS))
+    p.add_argument("--out", default="bench-results.json")
+    p.add_argument("--baseline", help="earlier results JSON to compare against")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # the app reads DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    logging.getLogger("aura.requests").setLevel(logging.ERROR)
+
+    from app.db import Base, SessionLocal, engine
+
+    from .seed import BenchConfig, seed
+
+    names = [n.strip() for n in args.scenarios.split(",") if n.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        print(f"unknown scenarios: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    cfg = BenchConfig(
+        users=args.users,
+        friend_degree=args.degree,
+        auras_per_user=args.auras,
+        invites_per_aura=args.invites,
+        seed=args.seed,
+    )
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        seeded = seed(db, cfg)
+    seed_seconds = time.perf_counter() - started
+    world = World(seeded)
+
+    if args.url:
+        import httpx
+
+        client = httpx.Client(base_url=args.url, timeout=30)
+    else:
+        from fastapi.testclient import TestClient
+
+        from app.main import app
+
+        client = TestClient(app)
+
+    results = {}
+    with client:
+        for i, name in enumerate(names):
+            results[name] = run_scenario(
+                client,
+                world,
+                SCENARIOS[name],
+                args.requests,
+                concurrency=args.concurrency,
+                warmup=args.warmup,
+                seed=args.seed + i,
+            )
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "mode": "http" if args.url else "in-process",
+            "url": args.url,
+            "dialect": engine.dialect.name,
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed_seconds": round(seed_seconds, 3),
+            "graph": seeded.summary(),
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print("\n".join(compare(report, baseline)))
+    print(f"results written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
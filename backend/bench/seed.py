@@ -0,0 +1,155 @@
+# backend/bench/seed.py
+"""Synthetic social graph for benchmarks.
+
+Deterministic for a given BenchConfig (same seed -> same rows), so runs
+against the same config can be compared with each other.
+"""
+import random
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app import auth, models
+
+FIRST_NAMES = [
+    "Anna", "Erik", "Sara", "Johan", "Maria", "Lars", "Emma", "Karl", "Elin",
+    "Oskar", "Ida", "Nils", "Linnea", "Axel", "Maja", "Hugo", "Alva", "Leo",
+]  # fmt: skip
+LAST_NAMES = [
+    "Andersson", "Johansson", "Karlsson", "Nilsson", "Eriksson", "Larsson",
+    "Olsson", "Persson", "Svensson", "Gustafsson", "Pettersson", "Lindberg",
+]  # fmt: skip
+
+
+@dataclass
+class BenchConfig:
+    users: int = 500
+    friend_degree: int = 20  # average accepted friends per user
+    auras_per_user: int = 4
+    invites_per_aura: int = 6
+    seed: int = 1
+
+
+@dataclass
+class SeedResult:
+    config: BenchConfig
+    friends: Dict[int, List[int]] = field(default_factory=dict)
+    # ping_id -> (creator_id, ics_secret)
+    auras: Dict[int, Tuple[int, str]] = field(default_factory=dict)
+    # invitee_id -> ping ids
+    invites: Dict[int, List[int]] = field(default_factory=dict)
+    names: List[str] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        return {
+            **asdict(self.config),
+            "friendships": sum(len(f) for f in self.friends.values()) // 2,
+            "aura_rows": len(self.auras),
+            "invite_rows": sum(len(i) for i in self.invites.values()),
+        }
+
+
+def seed(db: Session, cfg: BenchConfig) -> SeedResult:
+    """Insert users, friendships, auras and invites into an empty database."""
+    rng = random.Random(cfg.seed)
+    out = SeedResult(cfg)
+    now = datetime.utcnow().replace(microsecond=0)
+    # one bcrypt hash for everybody, hashing thousands of passwords is not
+    # what we are measuring
+    password_hash = auth.hash_pw("bench-password")
+
+    users = []
+    for uid in range(1, cfg.users + 1):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        out.names.append(name)
+        users.append(
+            {
+                "id": uid,
+                "email": f"bench{uid}@example.com",
+                "name": name,
+                "password_hash": password_hash,
+                "timezone": "Europe/Stockholm",
+            }
+        )
+        out.friends[uid] = []
+    db.execute(insert(models.User), users)
+
+    pairs = set()
+    per_user = max(cfg.friend_degree // 2, 0)
+    for uid in range(1, cfg.users + 1):
+        for _ in range(per_user):
+            other = rng.randint(1, cfg.users)
+            if other != uid:
+                pairs.add(models.Friendship.pair(uid, other))
+    for low, high in pairs:
+        out.friends[low].append(high)
+        out.friends[high].append(low)
+    if pairs:
+        db.execute(
+            insert(models.Friendship),
+            [
+                {
+                    "low_id": low,
+                    "high_id": high,
+                    "requester_id": low,
+                    "status": models.FriendshipStatus.accepted,
+                }
+                for low, high in sorted(pairs)
+            ],
+        )
+
+    auras, invites = [], []
+    ping_id = 0
+    for uid in range(1, cfg.users + 1):
+        friends = out.friends[uid]
+        for _ in range(cfg.auras_per_user):
+            if not friends:
+                break
+            ping_id += 1
+            secret = f"bench-{ping_id}-{rng.getrandbits(32):08x}"
+            starts_at = now + timedelta(hours=rng.randint(-24 * 30, 24 * 60))
+            auras.append(
+                {
+                    "id": ping_id,
+                    "creator_id": uid,
+                    "title": rng.choice(["Fika", "Beer", "Walk", "Gym", "Dinner"]),
+                    "starts_at": starts_at,
+                    "location": "Stockholm",
+                    "notes": "",
+                    "ics_secret": secret,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+            out.auras[ping_id] = (uid, secret)
+            k = min(cfg.invites_per_aura, len(friends))
+            for invitee in rng.sample(friends, k):
+                status = rng.choice(list(models.InviteStatus))
+                invites.append(
+                    {
+                        "ping_id": ping_id,
+                        "invitee_id": invitee,
+                        "status": status,
+                        "updated_at": now,
+                    }
+                )
+                out.invites.setdefault(invitee, []).append(ping_id)
+    if auras:
+        db.execute(insert(models.Ping), auras)
+    if invites:
+        db.execute(insert(models.PingInvite), invites)
+
+    if db.get_bind().dialect.name == "postgresql":
+        # ids were given explicitly: move the sequences past them
+        for table in ("users", "auras"):
+            db.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+                )
+            )
+    db.commit()
+    return out
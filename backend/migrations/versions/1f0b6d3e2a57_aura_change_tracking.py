@@ -0,0 +1,61 @@
+"""change tracking columns and inbox indexes on auras / aura_invites
+
+Adds updated_at / version (used by /pings/changes) to auras and
+aura_invites, plus the composite indexes behind the inbox query. Existing
+rows start at version 1 with updated_at = created_at.
+
+Revision ID: 1f0b6d3e2a57
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "1f0b6d3e2a57"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ("auras", "aura_invites"):
+        op.add_column(table, sa.Column("updated_at", sa.DateTime(), nullable=True))
+        # server default only to fill the existing rows
+        op.add_column(
+            table,
+            sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        )
+    op.execute("UPDATE auras SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+    op.execute(
+        """
+        UPDATE aura_invites SET updated_at = COALESCE(
+            responded_at,
+            (SELECT created_at FROM auras WHERE auras.id = aura_invites.ping_id),
+            CURRENT_TIMESTAMP
+        )
+        """
+    )
+    op.create_index("ix_auras_updated_at", "auras", ["updated_at"])
+    op.create_index("ix_auras_creator_starts", "auras", ["creator_id", "starts_at"])
+    op.create_index(
+        "ix_invites_invitee_status_ping",
+        "aura_invites",
+        ["invitee_id", "status", "ping_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_invites_invitee_status_ping", table_name="aura_invites")
+    op.drop_index("ix_auras_creator_starts", table_name="auras")
+    op.drop_index("ix_auras_updated_at", table_name="auras")
+    for table in ("aura_invites", "auras"):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("version")
+            batch.drop_column("updated_at")
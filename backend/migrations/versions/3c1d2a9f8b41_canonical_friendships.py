@@ -0,0 +1,86 @@
+"""canonical friendships: one row per unordered pair
+
+Collapses the mirrored (user_id, friend_id) rows into a single
+(low_id, high_id) row with a requester column. The requester of a legacy
+pending pair can't be recovered, so it is left NULL (both users keep seeing
+it as an incoming request, as before).
+
+Revision ID: 3c1d2a9f8b41
+Revises: 1f0b6d3e2a57
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "3c1d2a9f8b41"
+down_revision: Union[str, Sequence[str], None] = "1f0b6d3e2a57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# the Postgres enum type already exists; reuse it instead of re-creating it
+friendship_status = postgresql.ENUM(
+    "accepted", "pending", name="friendshipstatus", create_type=False
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "friendships_new",
+        sa.Column("low_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("high_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column(
+            "requester_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True
+        ),
+        sa.Column("status", friendship_status, nullable=True),
+        sa.CheckConstraint("low_id < high_id", name="ck_friendship_order"),
+    )
+    # 'accepted' sorts first (alphabetically and in the Postgres enum), so a
+    # pair is accepted if either of its rows was
+    op.execute(
+        """
+        INSERT INTO friendships_new (low_id, high_id, requester_id, status)
+        SELECT
+            CASE WHEN user_id < friend_id THEN user_id ELSE friend_id END,
+            CASE WHEN user_id < friend_id THEN friend_id ELSE user_id END,
+            NULL,
+            MIN(status)
+        FROM friendships
+        WHERE user_id <> friend_id
+        GROUP BY
+            CASE WHEN user_id < friend_id THEN user_id ELSE friend_id END,
+            CASE WHEN user_id < friend_id THEN friend_id ELSE user_id END
+        """
+    )
+    op.drop_table("friendships")
+    op.rename_table("friendships_new", "friendships")
+    op.create_index("ix_friendships_high_id", "friendships", ["high_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_table(
+        "friendships_old",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column(
+            "friend_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True
+        ),
+        sa.Column("status", friendship_status, nullable=True),
+    )
+    op.execute(
+        """
+        INSERT INTO friendships_old (user_id, friend_id, status)
+        SELECT low_id, high_id, status FROM friendships
+        UNION ALL
+        SELECT high_id, low_id, status FROM friendships
+        """
+    )
+    op.drop_index("ix_friendships_high_id", table_name="friendships")
+    op.drop_table("friendships")
+    op.rename_table("friendships_old", "friendships")
@@ -0,0 +1,44 @@
+"""job_leases table and partial index on open auras
+
+Adds the scheduler's leader lease table and ix_auras_open_starts, an index
+on auras.starts_at limited to status = 'open'.
+
+Revision ID: 8e4f7b2c1d05
+Revises: 3c1d2a9f8b41
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e4f7b2c1d05"
+down_revision: Union[str, Sequence[str], None] = "3c1d2a9f8b41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "job_leases",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("holder", sa.String(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_auras_open_starts",
+        "auras",
+        ["starts_at"],
+        sqlite_where=sa.text("status = 'open'"),
+        postgresql_where=sa.text("status = 'open'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_auras_open_starts", table_name="auras")
+    op.drop_table("job_leases")
@@ -0,0 +1,75 @@
+"""archive tables for old auras and their invites
+
+Revision ID: b7a9c3e5d210
+Revises: 8e4f7b2c1d05
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b7a9c3e5d210"
+down_revision: Union[str, Sequence[str], None] = "8e4f7b2c1d05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# the Postgres enum types already exist (auras / aura_invites use them)
+aura_status = postgresql.ENUM("open", "closed", name="aurastatus", create_type=False)
+invite_status = postgresql.ENUM(
+    "pending", "accepted", "declined", "maybe", name="invitestatus", create_type=False
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "auras_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column(
+            "creator_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False
+        ),
+        sa.Column("title", sa.String()),
+        sa.Column("starts_at", sa.DateTime(), nullable=False),
+        sa.Column("location", sa.String(), nullable=False),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("status", aura_status),
+        sa.Column("ics_secret", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("activity_type", sa.String(), nullable=True),
+        sa.Column("activity_custom_label", sa.String(), nullable=True),
+        sa.Column("archived_at", sa.DateTime()),
+    )
+    op.create_index("ix_auras_archive_creator_id", "auras_archive", ["creator_id"])
+    op.create_table(
+        "aura_invites_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column(
+            "ping_id", sa.Integer(), sa.ForeignKey("auras_archive.id"), nullable=False
+        ),
+        sa.Column(
+            "invitee_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False
+        ),
+        sa.Column("status", invite_status),
+        sa.Column("responded_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("version", sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        "ix_aura_invites_archive_ping_id", "aura_invites_archive", ["ping_id"]
+    )
+    op.create_index(
+        "ix_aura_invites_archive_invitee_id", "aura_invites_archive", ["invitee_id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("aura_invites_archive")
+    op.drop_table("auras_archive")
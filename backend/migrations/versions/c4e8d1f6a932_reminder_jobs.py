@@ -0,0 +1,53 @@
+"""reminder job queue
+
+Revision ID: c4e8d1f6a932
+Revises: b7a9c3e5d210
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e8d1f6a932"
+down_revision: Union[str, Sequence[str], None] = "b7a9c3e5d210"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+reminder_status = sa.Enum(
+    "pending", "sending", "sent", "failed", "cancelled", name="reminderstatus"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "reminder_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("ping_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("run_at", sa.DateTime(), nullable=False),
+        sa.Column("status", reminder_status, nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("locked_by", sa.String(), nullable=True),
+        sa.Column("locked_until", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("user_id", "ping_id", "kind", name="uniq_reminder"),
+    )
+    op.create_index("ix_reminder_jobs_ping_id", "reminder_jobs", ["ping_id"])
+    op.create_index("ix_reminder_jobs_locked_by", "reminder_jobs", ["locked_by"])
+    op.create_index(
+        "ix_reminders_status_run_at", "reminder_jobs", ["status", "run_at"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("reminder_jobs")
+    reminder_status.drop(op.get_bind(), checkfirst=True)
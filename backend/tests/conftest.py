@@ -14,13 +14,18 @@ if BACKEND_DIR not in sys.path:
 # Viktigt: sätt test-databas INNAN app importeras
 os.environ["DATABASE_URL"] = "sqlite:///./test.sqlite3"
 
+from app import api, auth
 from app.db import Base, SessionLocal, engine
+from app.graph import friend_graph
 from app.main import app
 
 
 @pytest.fixture(autouse=True)
 def setup_db():
     """Nollställer DB före varje test."""
+    auth.user_cache.clear()
+    friend_graph.clear()
+    api.ics_cache.clear()
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
     yield
@@ -30,3 +35,79 @@ def setup_db():
 @pytest.fixture
 def client():
     return TestClient(app)
+
+
+@pytest.fixture
+def assert_max_queries():
+    """assert_max_queries(resp, n): fail if the request ran more than n queries."""
+
+    def check(resp, limit: int) -> None:
+        used = int(resp.headers["x-query-count"])
+        assert used <= limit, (
+            f"{resp.request.method} {resp.request.url.path} ran {used} queries "
+            f"(budget {limit})"
+        )
+
+    return check
+
+
+# -------- API helpers (users are (token, id) tuples) --------
+
+
+@pytest.fixture
+def auth_header():
+    """auth_header(token) -> Authorization header for that token."""
+
+    def header(token: str) -> dict:
+        return {"Authorization": f"Bearer {token}"}
+
+    return header
+
+
+@pytest.fixture
+def register(client, auth_header):
+    """register(email, name=None) -> (token, user id), through the API."""
+
+    def register_user(email: str, name: str = None) -> tuple:
+        r = client.post(
+            "/api/auth/register",
+            json={
+                "email": email,
+                "name": name or email.split("@")[0],
+                "password": "secret",
+            },
+        )
+        assert r.status_code == 200, r.text
+        token = r.json()["access_token"]
+        return token, client.get("/api/me", headers=auth_header(token)).json()["id"]
+
+    return register_user
+
+
+@pytest.fixture
+def befriend(client, auth_header):
+    """befriend(a, b): a sends a friend request, b approves it."""
+
+    def make_friends(a: tuple, b: tuple) -> None:
+        client.post(f"/api/friends/{b[1]}/request", headers=auth_header(a[0]))
+        r = client.post(f"/api/friends/{a[1]}/approve", headers=auth_header(b[0]))
+        assert r.status_code == 200
+
+    return make_friends
+
+
+@pytest.fixture
+def create_aura(client, auth_header):
+    """create_aura(token, invitee_ids, **fields) -> the POST /api/pings response."""
+
+    def create(token: str, invitee_ids: list, **fields):
+        body = {
+            "title": "Fika",
+            "location": "Café",
+            "starts_at": "2030-01-01T15:00:00Z",
+            "invitee_ids": invitee_ids,
+            **fields,
+        }
+        return client.post("/api/pings", headers=auth_header(token), json=body)
+
+    return create
@@ -0,0 +1,66 @@
+# backend/tests/test_archive.py
+from datetime import datetime, timedelta
+
+from app import api, models
+from app.db import SessionLocal
+from app.jobs import ARCHIVE_AFTER, archive_old_auras
+
+
+def add_aura(db, creator_id, invitee_id, starts_at, status):
+    p = models.Ping(
+        creator_id=creator_id,
+        title="Old",
+        starts_at=starts_at,
+        location="Bar",
+        status=status,
+    )
+    db.add(p)
+    db.flush()
+    db.add(models.PingInvite(ping_id=p.id, invitee_id=invitee_id))
+    db.commit()
+    return p.id
+
+
+def test_archive_moves_old_closed_auras_and_falls_back(client, auth_header, register):
+    token1, id1 = register("arch1@example.com")
+    token2, id2 = register("arch2@example.com")
+    old = datetime.utcnow() - ARCHIVE_AFTER - timedelta(days=1)
+    closed, open_ = models.AuraStatus.closed, models.AuraStatus.open
+    with SessionLocal() as db:
+        archived = [add_aura(db, id1, id2, old, closed) for _ in range(3)]
+        kept_open = add_aura(db, id1, id2, old, open_)
+        recent = add_aura(db, id1, id2, datetime.utcnow(), closed)
+        newest = add_aura(db, id1, id2, old, closed)  # holds the max ids
+
+    before = client.get(f"/api/pings/{archived[0]}", headers=auth_header(token2))
+    ics_url = before.json()["ics_public_url"]
+    ics_before = client.get(ics_url).text
+
+    with SessionLocal() as db:
+        assert archive_old_auras(db, batch_size=2) == 3
+        assert archive_old_auras(db) == 0
+        hot = {p.id for p in db.query(models.Ping)}
+        assert hot == {kept_open, recent, newest}
+        assert db.query(models.PingInvite).count() == 3
+        assert db.query(models.ArchivedPingInvite).count() == 3
+        assert {p.id for p in db.query(models.ArchivedPing)} == set(archived)
+
+    after = client.get(f"/api/pings/{archived[0]}", headers=auth_header(token2))
+    assert after.status_code == 200
+    assert after.json() == before.json()
+    assert after.json()["invites"][0]["user"]["id"] == id2
+
+    api.ics_cache.clear()
+    ics = client.get(ics_url)
+    assert ics.status_code == 200
+    assert ics.text == ics_before
+
+    # archived auras are out of the hot paths
+    inbox = client.get("/api/pings/inbox", headers=auth_header(token2)).json()
+    assert archived[0] not in {p["id"] for p in inbox}
+    r = client.post(
+        f"/api/pings/{archived[0]}/respond",
+        headers=auth_header(token2),
+        json={"status": "accepted"},
+    )
+    assert r.status_code == 404
@@ -0,0 +1,60 @@
+# backend/tests/test_auth.py
+import asyncio
+import threading
+
+from passlib.hash import bcrypt
+
+from app import auth, models
+from app.db import SessionLocal
+
+
+def test_login_upgrades_legacy_bcrypt_hash(client):
+    db = SessionLocal()
+    db.add(
+        models.User(
+            email="old@example.com",
+            name="Old",
+            password_hash=bcrypt.hash("secret"),
+        )
+    )
+    db.commit()
+
+    r = client.post(
+        "/api/auth/login", json={"email": "old@example.com", "password": "secret"}
+    )
+    assert r.status_code == 200
+
+    db.expire_all()
+    u = db.query(models.User).filter_by(email="old@example.com").one()
+    assert u.password_hash.startswith("$bcrypt-sha256$")
+    db.close()
+
+    r = client.post(
+        "/api/auth/login", json={"email": "old@example.com", "password": "wrong"}
+    )
+    assert r.status_code == 401
+
+
+def test_hashing_pool_rejects_when_saturated(client, monkeypatch):
+    monkeypatch.setattr(auth, "_hash_in_flight", auth.HASH_WORKERS + 10**6)
+    r = client.post(
+        "/api/auth/register",
+        json={"email": "busy@example.com", "name": "Busy", "password": "secret"},
+    )
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "1"
+
+
+def test_hashing_pool_never_forks_and_stays_below_the_threadpool():
+    assert auth._pool_context().get_start_method() in ("forkserver", "spawn")
+    assert auth.HASH_MAX_IN_FLIGHT < 40  # anyio's default thread limit
+
+
+def test_hashing_without_a_pool_stays_off_the_event_loop(monkeypatch):
+    monkeypatch.setattr(auth, "HASH_WORKERS", 0)
+    threads = []
+    monkeypatch.setattr(
+        auth, "_hash", lambda plain: threads.append(threading.get_ident()) or plain
+    )
+    assert asyncio.run(auth.hash_pw_async("secret")) == "secret"
+    assert threads and threads[0] != threading.get_ident()
@@ -0,0 +1,31 @@
+# backend/tests/test_bench.py
+"""Smoke test: the benchmark scenarios still work against the current API."""
+from app.db import SessionLocal
+from bench.run import SCENARIOS, World, compare, percentile, run_scenario
+from bench.seed import BenchConfig, seed
+
+
+def test_seeded_graph_drives_every_scenario(client):
+    cfg = BenchConfig(users=30, friend_degree=6, auras_per_user=2, invites_per_aura=3)
+    with SessionLocal() as db:
+        seeded = seed(db, cfg)
+    summary = seeded.summary()
+    assert summary["aura_rows"] > 0 and summary["invite_rows"] > 0
+
+    world = World(seeded)
+    results = {}
+    for name, fn in SCENARIOS.items():
+        results[name] = run_scenario(client, world, fn, requests=5, warmup=1)
+        assert results[name]["errors"] == 0, name
+        assert results[name]["queries_max"] is not None
+
+    report = {"results": results}
+    assert len(compare(report, report)) == len(SCENARIOS)
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([7.0], 99) == 7.0
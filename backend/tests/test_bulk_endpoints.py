@@ -0,0 +1,66 @@
+# backend/tests/test_bulk_endpoints.py
+def test_respond_batch(client, auth_header, register, befriend, create_aura):
+    host, guest = register("host@example.com"), register("g@example.com")
+    befriend(host, guest)
+    a1 = create_aura(host[0], [guest[1]]).json()["id"]
+    a2 = create_aura(host[0], [guest[1]]).json()["id"]
+
+    r = client.post(
+        "/api/pings/respond:batch",
+        headers=auth_header(guest[0]),
+        json={
+            "items": [
+                {"ping_id": a1, "status": "maybe"},
+                {"ping_id": a2, "status": "accepted"},
+                {"ping_id": 999, "status": "maybe"},
+            ]
+        },
+    )
+    assert r.status_code == 200
+    assert r.json()["results"] == [
+        {"ping_id": a1, "ok": True, "error": None},
+        {"ping_id": a2, "ok": True, "error": None},
+        {"ping_id": 999, "ok": False, "error": "no_invite"},
+    ]
+
+    inbox = client.get("/api/pings/inbox", headers=auth_header(host[0])).json()
+    assert {p["id"]: p["invites"][0]["status"] for p in inbox} == {
+        a1: "maybe",
+        a2: "accepted",
+    }
+    assert {p["version"] for p in inbox} == {2}
+
+
+def test_add_invitees(client, auth_header, register, befriend, create_aura):
+    host, g1, g2 = (
+        register("host@example.com"),
+        register("g1@example.com"),
+        register("g2@example.com"),
+    )
+    stranger = register("s@example.com")
+    befriend(host, g1)
+    befriend(host, g2)
+    aura_id = create_aura(host[0], [g1[1]]).json()["id"]
+
+    r = client.post(
+        f"/api/pings/{aura_id}/invitees",
+        headers=auth_header(host[0]),
+        json={"invitee_ids": [g1[1], g2[1], stranger[1], host[1], g2[1]]},
+    )
+    assert r.status_code == 200
+    assert r.json()["results"] == [
+        {"user_id": g1[1], "ok": False, "error": "already_invited"},
+        {"user_id": g2[1], "ok": True, "error": None},
+        {"user_id": stranger[1], "ok": False, "error": "not_friend"},
+        {"user_id": host[1], "ok": False, "error": "self"},
+    ]
+    aura = client.get(f"/api/pings/{aura_id}", headers=auth_header(host[0])).json()
+    assert [i["user"]["id"] for i in aura["invites"]] == [g1[1], g2[1]]
+
+    # Only the creator can invite
+    r = client.post(
+        f"/api/pings/{aura_id}/invitees",
+        headers=auth_header(g1[0]),
+        json={"invitee_ids": [g2[1]]},
+    )
+    assert r.status_code == 403
@@ -0,0 +1,73 @@
+# backend/tests/test_db_pool.py
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+from app import db
+
+
+def file_engine(path):
+    url = f"sqlite:///{path}"
+    eng = create_engine(url, **db.engine_options(url))
+    db.apply_sqlite_pragmas(eng)
+    return eng
+
+
+def test_new_connections_get_wal_and_busy_timeout(tmp_path):
+    eng = file_engine(tmp_path / "pool.sqlite3")
+    assert isinstance(eng.pool, db.TimedQueuePool)
+    with eng.connect() as conn:
+
+        def pragma(name):
+            return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+        assert pragma("journal_mode") == "wal"
+        assert pragma("busy_timeout") == db.SQLITE_PRAGMAS["busy_timeout"]
+        assert pragma("synchronous") == 1  # NORMAL
+    eng.dispose()
+
+    # in-memory databases keep SQLAlchemy's single shared connection
+    assert "poolclass" not in db.engine_options("sqlite://")
+
+
+def test_pool_stats_report_checkouts_and_wait(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "POOL_SIZE", 1)
+    monkeypatch.setattr(db, "POOL_MAX_OVERFLOW", 0)
+    eng = file_engine(tmp_path / "pool.sqlite3")
+    before = db.pool_stats(eng)
+
+    # a second thread waits for the one connection while it is held
+    held = eng.connect()
+    assert db.pool_stats(eng)["checked_out"] == 1
+    waiter = threading.Thread(target=lambda: eng.connect().close())
+    waiter.start()
+    time.sleep(0.2)
+    held.close()
+    waiter.join()
+
+    after = db.pool_stats(eng)
+    assert after["checkouts"] - before["checkouts"] == 2
+    assert after["checkout_wait_seconds_max"] >= 0.15
+    waited = (
+        after["checkout_wait_seconds_total"] - before["checkout_wait_seconds_total"]
+    )
+    assert waited >= 0.15
+    assert (after["size"], after["checked_out"], after["max_overflow"]) == (1, 0, 0)
+    eng.dispose()
+
+
+def test_pool_stats_count_checkout_timeouts(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "POOL_SIZE", 1)
+    monkeypatch.setattr(db, "POOL_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(db, "POOL_TIMEOUT", 0.1)
+    eng = file_engine(tmp_path / "pool.sqlite3")
+    before = db.pool_stats(eng)["checkout_timeouts"]
+
+    with eng.connect():
+        with pytest.raises(PoolTimeout):
+            eng.connect()
+    assert db.pool_stats(eng)["checkout_timeouts"] == before + 1
+    eng.dispose()
@@ -0,0 +1,140 @@
+# backend/tests/test_events.py
+import asyncio
+import sqlite3
+
+import pytest
+from starlette.requests import Request
+
+from app import events
+from app.auth import make_token
+from app.events import MemoryBroker, SqliteBroker
+
+
+class RecordingBroker(MemoryBroker):
+    def __init__(self):
+        super().__init__()
+        self.published, self.subscribed = [], []
+
+    def publish(self, channel: str, event: dict) -> None:
+        self.published.append((channel, event["type"]))
+        super().publish(channel, event)
+
+    def subscribe(self, channel: str):
+        self.subscribed.append(channel)
+        return super().subscribe(channel)
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    recording = RecordingBroker()
+    monkeypatch.setattr(events, "broker", recording)
+    return recording
+
+
+def roundtrip(broker) -> list:
+    async def run():
+        async with broker.subscribe("user:1") as sub:
+            broker.publish("user:2", {"type": "other"})
+            broker.publish("user:1", {"type": "invite.created", "ping_id": 7})
+            return [await sub.get(timeout=2), await sub.get(timeout=0.5)]
+
+    return asyncio.run(run())
+
+
+def test_memory_broker_delivers_to_channel():
+    assert roundtrip(MemoryBroker()) == [
+        {"type": "invite.created", "ping_id": 7},
+        None,
+    ]
+
+
+def test_sqlite_broker_delivers_across_instances(tmp_path):
+    path = str(tmp_path / "events.sqlite3")
+    # Two instances = two workers sharing the file
+    subscriber, publisher = SqliteBroker(path, 0.05), SqliteBroker(path, 0.05)
+
+    async def run():
+        async with subscriber.subscribe("user:1") as sub:
+            await asyncio.sleep(0.1)  # let the poller start
+            publisher.publish("user:1", {"type": "rsvp.changed"})
+            return await sub.get(timeout=2)
+
+    assert asyncio.run(run()) == {"type": "rsvp.changed"}
+
+
+def test_sqlite_poller_survives_database_errors(tmp_path, caplog):
+    path = str(tmp_path / "events.sqlite3")
+    subscriber, publisher = SqliteBroker(path, 0.05), SqliteBroker(path, 0.05)
+    connect, failures = subscriber._connect, []
+
+    def flaky_connect():
+        if len(failures) < 2:
+            failures.append(1)
+            raise sqlite3.OperationalError("database is locked")
+        return connect()
+
+    subscriber._connect = flaky_connect
+
+    async def run():
+        async with subscriber.subscribe("user:1") as sub:
+            await asyncio.sleep(0.3)  # two failed polls, then a good one
+            publisher.publish("user:1", {"type": "rsvp.changed"})
+            return await sub.get(timeout=2)
+
+    assert asyncio.run(run()) == {"type": "rsvp.changed"}
+    assert "database is locked" in caplog.text
+
+
+def test_handlers_publish_to_the_recipients_channel(
+    client, broker, auth_header, register, befriend, create_aura
+):
+    (token1, user1_id), (token2, user2_id) = (
+        register("user1@example.com"),
+        register("user2@example.com"),
+    )
+    befriend((token1, user1_id), (token2, user2_id))
+    ping_id = create_aura(token1, [user2_id]).json()["id"]
+    client.post(
+        f"/api/pings/{ping_id}/respond",
+        headers=auth_header(token2),
+        json={"status": "accepted"},
+    )
+
+    assert broker.published == [
+        (f"user:{user2_id}", "friend.requested"),
+        (f"user:{user2_id}", "invite.created"),
+        (f"user:{user1_id}", "rsvp.changed"),
+    ]
+
+
+def test_repeated_friend_request_publishes_once(client, broker, auth_header, register):
+    (token1, user1_id), (token2, user2_id) = (
+        register("user1@example.com"),
+        register("user2@example.com"),
+    )
+    for token, other_id in [(token1, user2_id), (token1, user2_id), (token2, user1_id)]:
+        r = client.post(f"/api/friends/{other_id}/request", headers=auth_header(token))
+        assert r.status_code == 200
+
+    assert broker.published == [(f"user:{user2_id}", "friend.requested")]
+
+
+def test_event_stream_auth(client, broker, monkeypatch, auth_header):
+    async def disconnected(self):
+        return True  # end the stream right after ": connected"
+
+    monkeypatch.setattr(Request, "is_disconnected", disconnected)
+    token = make_token(42)
+
+    assert client.get("/api/events").status_code == 401
+    assert client.get("/api/events", params={"token": "nope"}).status_code == 401
+    r = client.get("/api/events", headers=auth_header("nope"))
+    assert r.status_code == 401
+
+    # EventSource can't set headers: ?token= works like the bearer header
+    for kwargs in ({"params": {"token": token}}, {"headers": auth_header(token)}):
+        r = client.get("/api/events", **kwargs)
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("text/event-stream")
+        assert r.text == ": connected\n\n"
+    assert broker.subscribed == ["user:42", "user:42"]
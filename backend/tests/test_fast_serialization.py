@@ -0,0 +1,60 @@
+# backend/tests/test_fast_serialization.py
+"""The aura endpoints skip response_model validation; keep them on schema."""
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app import schemas
+
+
+def as_schema(schema, payload):
+    """payload as the validated response_model would have serialized it."""
+    return TypeAdapter(schema).dump_python(
+        TypeAdapter(schema).validate_python(payload), mode="json"
+    )
+
+
+def test_aura_payloads_match_response_models(
+    client, auth_header, register, befriend, create_aura
+):
+    token1, id1 = register("fast1@example.com")
+    token2, id2 = register("fast2@example.com")
+    befriend((token1, id1), (token2, id2))
+
+    created = create_aura(
+        token1,
+        [id2],
+        title="Öl",
+        location="Kvarnen",
+        starts_at="2030-01-01T18:30:00Z",
+        activity_type="DRINK",
+    )
+    assert created.status_code == 201
+    assert created.headers["content-type"] == "application/json"
+    body = created.json()
+    assert body == as_schema(schemas.PingOut, body)
+    assert body["creator"]["id"] == id1
+    assert body["invites"] == [
+        {
+            "user": {
+                "id": id2,
+                "email": "fast2@example.com",
+                "name": "fast2",
+                "timezone": "Europe/Stockholm",
+            },
+            "status": "pending",
+        }
+    ]
+    assert body["activity_label"] == "Drink"
+
+    one = client.get(f"/api/pings/{body['id']}", headers=auth_header(token2)).json()
+    assert one == as_schema(schemas.PingOut, one)
+    assert one["starts_at"].startswith("2030-01-01T18:30:00")
+    assert one == body
+
+    inbox = client.get("/api/pings/inbox", headers=auth_header(token2)).json()
+    assert inbox == as_schema(List[schemas.PingOut], inbox) == [one]
+
+    changes = client.get("/api/pings/changes", headers=auth_header(token2)).json()
+    assert changes == as_schema(schemas.PingChangesOut, changes)
+    assert changes["changed"] == [one]
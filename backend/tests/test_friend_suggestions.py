@@ -0,0 +1,79 @@
+# backend/tests/test_friend_suggestions.py
+import random
+
+import pytest
+
+from app.graph import friend_graph, intersect_sorted
+
+
+@pytest.fixture
+def unfriend(client, auth_header):
+    def remove(a: tuple, b: tuple) -> None:
+        r = client.delete(f"/api/friends/{b[1]}", headers=auth_header(a[0]))
+        assert r.status_code == 204
+
+    return remove
+
+
+@pytest.fixture
+def suggestions(client, auth_header):
+    def get(me: tuple) -> list:
+        r = client.get("/api/friends/suggestions", headers=auth_header(me[0]))
+        assert r.status_code == 200
+        return [(s["user"]["id"], s["mutual_count"]) for s in r.json()]
+
+    return get
+
+
+def test_intersect_sorted():
+    assert intersect_sorted([1, 3, 5, 7], [2, 3, 4, 7, 9]) == [3, 7]
+    assert intersect_sorted([5], list(range(2000))) == [5]
+    assert intersect_sorted([], [1, 2]) == []
+    big, small = list(range(0, 4000, 2)), [1, 2, 3, 3998, 4001]
+    assert intersect_sorted(big, small) == [2, 3998]
+
+
+def test_suggestions_and_mutual_friends(
+    client, auth_header, register, befriend, suggestions
+):
+    me, a, b, c, d = [register(f"u{i}@example.com") for i in range(5)]
+    befriend(me, a)
+    befriend(me, b)
+    befriend(a, c)
+    befriend(b, c)
+    befriend(a, d)
+
+    assert suggestions(me) == [(c[1], 2), (d[1], 1)]
+
+    r = client.get(f"/api/users/{c[1]}/mutual", headers=auth_header(me[0]))
+    assert [u["id"] for u in r.json()] == [a[1], b[1]]
+    r = client.get(f"/api/users/{me[1]}/mutual", headers=auth_header(d[0]))
+    assert [u["id"] for u in r.json()] == [a[1]]
+
+    # a pending request (either way) hides the suggestion
+    client.post(f"/api/friends/{me[1]}/request", headers=auth_header(c[0]))
+    assert suggestions(me) == [(d[1], 1)]
+    client.post(f"/api/friends/{me[1]}/decline", headers=auth_header(c[0]))
+    assert suggestions(me) == [(c[1], 2), (d[1], 1)]
+
+
+def test_cached_scores_follow_edge_changes(register, befriend, unfriend, suggestions):
+    users = [register(f"g{i}@example.com") for i in range(8)]
+    rng = random.Random(7)
+    edges = set()
+    for _ in range(40):
+        i, j = sorted(rng.sample(range(len(users)), 2))
+        if (i, j) in edges:
+            unfriend(users[i], users[j])
+            edges.discard((i, j))
+        else:
+            befriend(users[i], users[j])
+            edges.add((i, j))
+        if rng.random() < 0.5:
+            # warm a few users' score caches between writes
+            for u in rng.sample(users, 3):
+                suggestions(u)
+
+        incremental = {u[1]: suggestions(u) for u in users}
+        friend_graph.clear()
+        assert {u[1]: suggestions(u) for u in users} == incremental
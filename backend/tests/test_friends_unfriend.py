@@ -0,0 +1,98 @@
+# backend/tests/test_friends_unfriend.py
+import pytest
+
+from app import models
+from app.db import SessionLocal
+
+
+@pytest.fixture
+def friend_ids(client, auth_header):
+    def ids(token: str) -> list:
+        r = client.get("/api/friends", headers=auth_header(token))
+        return [u["id"] for u in r.json()]
+
+    return ids
+
+
+def test_friend_lifecycle_and_invite_validation(
+    client, auth_header, register, friend_ids, create_aura
+):
+    token1, user1_id = register("user1@example.com")
+    token2, user2_id = register("user2@example.com")
+
+    # Load both users' friend sets before any change
+    assert friend_ids(token1) == []
+    assert friend_ids(token2) == []
+
+    client.post(f"/api/friends/{user2_id}/request", headers=auth_header(token1))
+    assert create_aura(token1, [user2_id]).status_code == 400
+
+    client.post(f"/api/friends/{user1_id}/approve", headers=auth_header(token2))
+    assert friend_ids(token1) == [user2_id]
+    assert friend_ids(token2) == [user1_id]
+    assert create_aura(token1, [user2_id]).status_code == 201
+
+    r = client.delete(f"/api/friends/{user2_id}", headers=auth_header(token1))
+    assert r.status_code == 204
+    assert friend_ids(token1) == []
+    assert friend_ids(token2) == []
+    assert create_aura(token2, [user1_id]).status_code == 400
+
+
+def test_decline_removes_incoming_request(client, auth_header, register):
+    token1, user1_id = register("user1@example.com")
+    token2, user2_id = register("user2@example.com")
+
+    client.post(f"/api/friends/{user2_id}/request", headers=auth_header(token1))
+    incoming = client.get("/api/friends/requests/incoming", headers=auth_header(token2))
+    assert [u["id"] for u in incoming.json()] == [user1_id]
+
+    client.post(f"/api/friends/{user1_id}/decline", headers=auth_header(token2))
+    incoming = client.get("/api/friends/requests/incoming", headers=auth_header(token2))
+    assert incoming.json() == []
+
+
+def test_friendship_is_one_row_per_pair(client, auth_header, register):
+    token1, user1_id = register("user1@example.com")
+    token2, user2_id = register("user2@example.com")
+
+    # Requesting twice (from both sides) keeps a single pending row
+    client.post(f"/api/friends/{user2_id}/request", headers=auth_header(token1))
+    client.post(f"/api/friends/{user1_id}/request", headers=auth_header(token2))
+    incoming = client.get("/api/friends/requests/incoming", headers=auth_header(token1))
+    assert incoming.json() == []  # your own request isn't incoming
+
+    client.post(f"/api/friends/{user1_id}/approve", headers=auth_header(token2))
+
+    db = SessionLocal()
+    rows = db.query(models.Friendship).all()
+    assert [(f.low_id, f.high_id, f.requester_id, f.status.value) for f in rows] == [
+        (user1_id, user2_id, user1_id, "accepted")
+    ]
+    db.close()
+
+
+def test_cannot_befriend_self(client, auth_header, register, friend_ids):
+    token, me = register("me@example.com")
+    for action in ("request", "approve"):
+        r = client.post(f"/api/friends/{me}/{action}", headers=auth_header(token))
+        assert r.status_code == 400
+    assert friend_ids(token) == []
+
+
+def test_approval_on_another_worker_is_not_rejected(
+    client, auth_header, register, friend_ids, create_aura
+):
+    token1, user1_id = register("user1@example.com")
+    token2, user2_id = register("user2@example.com")
+    client.post(f"/api/friends/{user2_id}/request", headers=auth_header(token1))
+    assert friend_ids(token1) == []  # cached: not friends yet
+
+    # approved by a worker whose write-through this process never saw
+    db = SessionLocal()
+    db.query(models.Friendship).update({"status": models.FriendshipStatus.accepted})
+    db.commit()
+    db.close()
+
+    assert create_aura(token1, [user2_id]).status_code == 201
+    assert friend_ids(token1) == [user2_id]  # cache refreshed
@@ -0,0 +1,91 @@
+# backend/tests/test_http_caching.py
+import hashlib
+
+import pytest
+
+from app.middleware import choose_encoding, etag_matches
+
+
+@pytest.fixture
+def aura(register, befriend, create_aura):
+    """(creator token, invitee token, invitee id, aura id)"""
+    host, guest = register("etag1@example.com"), register("etag2@example.com")
+    befriend(host, guest)
+    return host[0], guest[0], guest[1], create_aura(host[0], [guest[1]]).json()["id"]
+
+
+def test_inbox_etag_and_304(client, auth_header, aura):
+    token1, token2, _, ping_id = aura
+
+    first = client.get("/api/pings/inbox", headers=auth_header(token2))
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    again = client.get(
+        "/api/pings/inbox", headers={**auth_header(token2), "If-None-Match": etag}
+    )
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    client.post(
+        f"/api/pings/{ping_id}/respond",
+        headers=auth_header(token2),
+        json={"status": "accepted"},
+    )
+    changed = client.get(
+        "/api/pings/inbox", headers={**auth_header(token2), "If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_handler_etags_and_errors_are_left_alone(client, auth_header, aura):
+    token1, _, _, ping_id = aura
+    ics_url = client.get(f"/api/pings/{ping_id}", headers=auth_header(token1)).json()[
+        "ics_public_url"
+    ]
+    ics = client.get(ics_url)
+    digest = hashlib.sha256(ics.content).hexdigest()[:32]
+    assert ics.headers["etag"] == f'"aura-{digest}"'
+
+    missing = client.get("/api/pings/999", headers=auth_header(token1))
+    assert missing.status_code == 404
+    assert "etag" not in missing.headers
+
+
+def test_large_json_is_gzipped(client, auth_header, create_aura, aura):
+    token1, token2, guest_id, _ = aura
+    for _ in range(10):
+        create_aura(token1, [guest_id])
+    r = client.get(
+        "/api/pings/inbox",
+        headers={**auth_header(token2), "Accept-Encoding": "gzip"},
+    )
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    assert len(r.json()) == 11
+    assert int(r.headers["content-length"]) < len(r.content)
+
+    raw = client.get(
+        "/api/pings/inbox",
+        headers={**auth_header(token2), "Accept-Encoding": "identity"},
+    )
+    assert "content-encoding" not in raw.headers
+    assert raw.json() == r.json()
+
+    small = client.get(
+        "/api/me", headers={**auth_header(token2), "Accept-Encoding": "gzip"}
+    )
+    assert "content-encoding" not in small.headers
+
+
+def test_choose_encoding_and_etag_matching():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("*") in ("br", "gzip")
+    assert choose_encoding(None) is None
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', 'W/"abc"')
+    assert not etag_matches('"abd"', 'W/"abc"')
@@ -0,0 +1,111 @@
+# backend/tests/test_ics.py
+from sqlalchemy import event
+
+from app import api, models
+from app.db import SessionLocal, engine
+
+
+def test_ics_public_is_cached_and_conditional(
+    client, auth_header, register, befriend, create_aura
+):
+    host, guest = register("host@example.com"), register("g@example.com")
+    befriend(host, guest)
+    aura = create_aura(
+        host[0],
+        [guest[1]],
+        title="Bastu",
+        location="Klippan",
+        starts_at="2030-01-01T18:00:00Z",
+    ).json()
+    url = aura["ics_public_url"]
+
+    r = client.get(url)
+    assert r.status_code == 200
+    assert "SUMMARY:Bastu" in r.text
+    etag, last_modified = r.headers["etag"], r.headers["last-modified"]
+
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        r = client.get(url, headers={"If-None-Match": etag})
+        assert r.status_code == 304 and r.content == b""
+        r = client.get(url, headers={"If-Modified-Since": last_modified})
+        assert r.status_code == 304
+        assert client.get(url).status_code == 200
+        assert client.get(url.replace("sig=", "sig=x")).status_code == 404
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert statements == []  # served from cache
+
+    # An RSVP rebuilds the entry but leaves the calendar text, and ETag, alone
+    client.post(
+        f"/api/pings/{aura['id']}/respond",
+        headers=auth_header(guest[0]),
+        json={"status": "accepted"},
+    )
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+
+    # ...while a change to what the event says gives a new one
+    with SessionLocal() as db:
+        db.get(models.Ping, aura["id"]).location = "Bryggan"
+        db.commit()
+    api.ics_cache.pop(aura["id"])
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert "LOCATION:Bryggan" in r.text
+    assert r.headers["etag"] != etag
+
+
+def test_calendar_feed_lists_created_and_accepted_auras(
+    client, auth_header, register, befriend, create_aura
+):
+    host, guest = register("host@example.com"), register("g@example.com")
+    befriend(host, guest)
+    for title in ("Middag, hos mig", "Löprunda"):
+        aura_id = create_aura(
+            host[0],
+            [guest[1]],
+            title=title,
+            location="Hemma",
+            starts_at="2030-06-01T16:00:00Z",
+        ).json()["id"]
+
+    url = client.get("/api/me/calendar-feed", headers=auth_header(guest[0])).json()[
+        "url"
+    ]
+    r = client.get(url)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/calendar")
+    assert "BEGIN:VEVENT" not in r.text  # nothing accepted yet
+    etag = r.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    client.post(
+        f"/api/pings/{aura_id}/respond",
+        headers=auth_header(guest[0]),
+        json={"status": "accepted"},
+    )
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.text.count("BEGIN:VEVENT") == 1
+    assert "SUMMARY:Löprunda" in r.text
+    # Written as UTC (no VTIMEZONE needed); the user's zone is a display hint
+    assert "DTSTART:20300601T160000Z" in r.text
+    assert "TZID=" not in r.text
+    assert "X-WR-TIMEZONE:Europe/Stockholm" in r.text
+
+    # The creator's feed has both, with escaped text
+    host_url = client.get("/api/me/calendar-feed", headers=auth_header(host[0])).json()[
+        "url"
+    ]
+    body = client.get(host_url).text
+    assert body.count("BEGIN:VEVENT") == 2
+    assert "SUMMARY:Middag\\, hos mig" in body
+
+    assert client.get(url.replace("sig=", "sig=0")).status_code == 404
@@ -0,0 +1,110 @@
+# backend/tests/test_inbox_paging.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import models
+from app.db import SessionLocal
+
+
+def add_auras(creator_id: int, offsets_hours: list) -> list:
+    """Auras starting at now + each offset; returns their ids in that order."""
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        pings = [
+            models.Ping(
+                creator_id=creator_id,
+                title=f"A{h}",
+                starts_at=now + timedelta(hours=h),
+                location="Bar",
+            )
+            for h in offsets_hours
+        ]
+        db.add_all(pings)
+        db.commit()
+        return [p.id for p in pings]
+
+
+def ids(resp) -> list:
+    assert resp.status_code == 200
+    return [p["id"] for p in resp.json()]
+
+
+@pytest.fixture
+def page_through(client, auth_header):
+    """page_through(token, **params) -> the ids of every page, in order."""
+
+    def pages(token: str, **params) -> list:
+        seen, cursor = [], None
+        while True:
+            query = {**params, **({"cursor": cursor} if cursor else {})}
+            r = client.get("/api/pings/inbox", params=query, headers=auth_header(token))
+            seen.append(ids(r))
+            cursor = r.headers.get("x-next-cursor")
+            if not cursor:
+                return seen
+
+    return pages
+
+
+def test_no_parameters_returns_everything_unpaginated(client, auth_header, register):
+    token, me = register("all@example.com")
+    # same start time for several rows: (starts_at, id) must still be stable
+    created = add_auras(me, [5] * 3 + list(range(-60, 60)))
+    r = client.get("/api/pings/inbox", headers=auth_header(token))
+    assert len(ids(r)) == len(created) > 100
+    assert "x-next-cursor" not in r.headers
+    starts = [p["starts_at"] for p in r.json()]
+    assert starts == sorted(starts)
+
+
+def test_cursor_pages_cover_the_list_once(client, auth_header, register, page_through):
+    token, me = register("pages@example.com")
+    add_auras(me, [5, 5, 5, -3, 8, 1, -10])
+    full = ids(client.get("/api/pings/inbox", headers=auth_header(token)))
+
+    pages = page_through(token, limit=2)
+    assert [len(p) for p in pages] == [2, 2, 2, 1]
+    assert sum(pages, []) == full
+
+
+def test_upcoming_and_past_windows(client, auth_header, register, page_through):
+    token, me = register("windows@example.com")
+    past = add_auras(me, [-1, -30, -5, -5])
+    upcoming = add_auras(me, [2, 40, 7])
+    with SessionLocal() as db:
+        closed = models.Ping(
+            creator_id=me,
+            starts_at=datetime.utcnow() + timedelta(hours=3),
+            location="Bar",
+            status=models.AuraStatus.closed,
+        )
+        db.add(closed)
+        db.commit()
+
+    r = client.get(
+        "/api/pings/inbox", params={"window": "upcoming"}, headers=auth_header(token)
+    )
+    assert ids(r) == [upcoming[0], upcoming[2], upcoming[1]]
+
+    # past is newest first, ties broken by id, descending as well
+    expected_past = [past[0], past[3], past[2], past[1]]
+    r = client.get(
+        "/api/pings/inbox", params={"window": "past"}, headers=auth_header(token)
+    )
+    assert ids(r) == expected_past
+    pages = page_through(token, window="past", limit=3)
+    assert pages == [expected_past[:3], expected_past[3:]]
+
+
+def test_cursor_header_is_exposed_to_browsers(client, auth_header, register):
+    token, me = register("cors@example.com")
+    add_auras(me, [1, 2])
+    r = client.get(
+        "/api/pings/inbox",
+        params={"limit": 1},
+        headers={**auth_header(token), "Origin": "https://app.example.com"},
+    )
+    assert r.headers["x-next-cursor"]
+    exposed = r.headers["access-control-expose-headers"].lower()
+    assert "x-next-cursor" in exposed
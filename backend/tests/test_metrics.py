@@ -0,0 +1,97 @@
+# backend/tests/test_metrics.py
+import os
+import subprocess
+import sys
+
+from prometheus_client.parser import text_string_to_metric_families
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def scrape(client) -> dict:
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    samples = {}
+    for family in text_string_to_metric_families(r.text):
+        for s in family.samples:
+            samples[(s.name, tuple(sorted(s.labels.items())))] = s.value
+    return samples
+
+
+def value(samples: dict, name: str, **labels) -> float:
+    return samples.get((name, tuple(sorted(labels.items()))), 0.0)
+
+
+def test_metrics_cover_routes_caches_and_business_counters(
+    client, auth_header, register, befriend, create_aura
+):
+    token1, id1 = register("m1@example.com")
+    token2, id2 = register("m2@example.com")
+    befriend((token1, id1), (token2, id2))
+
+    before = scrape(client)
+    ping_id = create_aura(token1, [id2]).json()["id"]
+    client.get(f"/api/pings/{ping_id}", headers=auth_header(token2))
+    client.post(
+        f"/api/pings/{ping_id}/respond",
+        headers=auth_header(token2),
+        json={"status": "accepted"},
+    )
+    client.get("/api/no-such-route")
+    after = scrape(client)
+
+    route = {"method": "GET", "route": "/api/pings/{ping_id}", "status": "200"}
+    assert value(after, "aura_http_request_duration_seconds_count", **route) == (
+        value(before, "aura_http_request_duration_seconds_count", **route) + 1
+    )
+    # raw paths never become label values
+    assert not any(("route", "/api/no-such-route") in labels for _, labels in after)
+    assert value(after, "aura_invites_created_total") == (
+        value(before, "aura_invites_created_total") + 1
+    )
+    assert value(after, "aura_rsvps_total", status="accepted") == (
+        value(before, "aura_rsvps_total", status="accepted") + 1
+    )
+    assert value(after, "aura_cache_hits_total", cache="auth_user") > value(
+        before, "aura_cache_hits_total", cache="auth_user"
+    )
+    # the scrape itself is in flight
+    assert value(after, "aura_http_requests_in_flight", method="GET") == 1
+    assert ("aura_db_pool_checked_out", ()) in after
+    assert ("aura_password_hash_queue_depth", ()) in after
+
+
+WORKER = """
+from app import metrics
+metrics.INVITES_CREATED.inc(3)
+metrics.RSVPS.labels("accepted").inc()
+"""
+
+SCRAPER = """
+import sys
+from app import metrics
+sys.stdout.write(metrics.render().decode())
+"""
+
+
+def test_metrics_are_summed_over_worker_processes(tmp_path):
+    env = {
+        **os.environ,
+        "PROMETHEUS_MULTIPROC_DIR": str(tmp_path),
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'metrics.sqlite3'}",
+    }
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, "-c", WORKER], cwd=BACKEND_DIR, env=env, check=True
+        )
+    out = subprocess.run(
+        [sys.executable, "-c", SCRAPER],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert "aura_invites_created_total 6.0" in out
+    assert 'aura_rsvps_total{status="accepted"} 2.0' in out
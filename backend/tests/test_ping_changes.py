@@ -0,0 +1,140 @@
+# backend/tests/test_ping_changes.py
+import time
+from datetime import datetime, timedelta
+
+from app import api, models
+from app.db import SessionLocal
+
+
+def test_changes_feed_returns_only_deltas(
+    client, auth_header, register, befriend, create_aura
+):
+    token1, user1_id = register("user1@example.com")
+    token2, user2_id = register("user2@example.com")
+    befriend((token1, user1_id), (token2, user2_id))
+
+    for title in ("First", "Second"):
+        r = create_aura(token1, [user2_id], title=title)
+        assert r.status_code == 201
+    first_id = r.json()["id"] - 1
+
+    # Full sync
+    r = client.get("/api/pings/changes", headers=auth_header(token2))
+    assert r.status_code == 200
+    body = r.json()
+    assert [p["title"] for p in body["changed"]] == ["First", "Second"]
+    cursor = body["cursor"]
+
+    # Nothing changed since the cursor: at most the overlap window comes
+    # back, with versions the client already has
+    seen = {(p["id"], p["version"]) for p in body["changed"]}
+    r = client.get(
+        "/api/pings/changes", params={"since": cursor}, headers=auth_header(token2)
+    )
+    assert {(p["id"], p["version"]) for p in r.json()["changed"]} <= seen
+    assert r.json()["removed"] == []
+
+    # An RSVP shows up for the creator with a bumped version
+    client.post(
+        f"/api/pings/{first_id}/respond",
+        headers=auth_header(token2),
+        json={"status": "accepted"},
+    )
+    r = client.get(
+        "/api/pings/changes", params={"since": cursor}, headers=auth_header(token1)
+    )
+    changed = {p["id"]: p for p in r.json()["changed"]}
+    assert changed[first_id]["version"] == 2
+    assert changed[first_id]["invites"][0]["status"] == "accepted"
+    assert {(i, p["version"]) for i, p in changed.items() if i != first_id} <= seen
+
+    # Declining turns into a tombstone for the invitee
+    client.post(
+        f"/api/pings/{first_id}/respond",
+        headers=auth_header(token2),
+        json={"status": "declined"},
+    )
+    r = client.get(
+        "/api/pings/changes", params={"since": cursor}, headers=auth_header(token2)
+    )
+    assert first_id not in [p["id"] for p in r.json()["changed"]]
+    assert r.json()["removed"] == [first_id]
+
+
+def add_auras(creator_id: int, n: int, updated_at: datetime) -> list:
+    with SessionLocal() as db:
+        pings = [
+            models.Ping(
+                creator_id=creator_id,
+                title=f"A{i}",
+                starts_at=datetime(2030, 1, 1),
+                location="Bar",
+                updated_at=updated_at,
+            )
+            for i in range(n)
+        ]
+        db.add_all(pings)
+        db.commit()
+        return [p.id for p in pings]
+
+
+def test_late_commit_is_not_skipped(client, auth_header, register):
+    token, me = register("late@example.com")
+    now = datetime.utcnow()
+    add_auras(me, 1, now)
+    cursor = client.get("/api/pings/changes", headers=auth_header(token)).json()[
+        "cursor"
+    ]
+
+    # a transaction that took its timestamp before that poll, but committed
+    # after it
+    (late,) = add_auras(me, 1, now - timedelta(seconds=5))
+    r = client.get(
+        "/api/pings/changes", params={"since": cursor}, headers=auth_header(token)
+    )
+    assert late in [p["id"] for p in r.json()["changed"]]
+
+
+def test_pages_advance_through_the_overlap_window(client, auth_header, register):
+    token, me = register("overlap@example.com")
+    created = add_auras(me, 7, datetime.utcnow())  # all in one overlap window
+
+    seen, cursor = [], None
+    for _ in range(10):
+        params = {"limit": 3, **({"since": cursor} if cursor else {})}
+        body = client.get(
+            "/api/pings/changes", params=params, headers=auth_header(token)
+        ).json()
+        seen += [p["id"] for p in body["changed"]]
+        cursor = body["cursor"]
+        if not body["has_more"]:
+            break
+    assert seen == created
+
+
+def test_idle_polls_settle_once_the_overlap_has_passed(
+    client, auth_header, register, monkeypatch
+):
+    monkeypatch.setattr(api, "CHANGES_OVERLAP", timedelta(seconds=0.3))
+    token, me = register("idle@example.com")
+    (aura,) = add_auras(me, 1, datetime.utcnow())
+
+    def poll(cursor):
+        params = {"since": cursor} if cursor else {}
+        r = client.get("/api/pings/changes", params=params, headers=auth_header(token))
+        body = r.json()
+        return [p["id"] for p in body["changed"]], body["cursor"]
+
+    changed, cursor = poll(None)
+    assert changed == [aura]
+    # still inside the overlap: re-sent, and the cursor never moves back
+    changed, again = poll(cursor)
+    assert changed == [aura]
+    assert api.decode_cursor(again) >= api.decode_cursor(cursor)
+    cursor = again
+
+    time.sleep(0.4)
+    changed, cursor = poll(cursor)
+    assert changed == [aura]  # last time: the cursor now passes it
+    assert poll(cursor) == ([], cursor)
+    assert poll(cursor) == ([], cursor)
@@ -0,0 +1,66 @@
+# backend/tests/test_query_budget.py
+import json
+import logging
+
+
+def test_server_timing_header(client, auth_header, register):
+    token, _ = register("timing@example.com")
+    r = client.get("/api/me", headers=auth_header(token))
+    timing = r.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert "app;dur=" in timing
+    assert int(r.headers["x-query-count"]) >= 0
+
+
+def test_request_log_line(client, caplog, auth_header, register):
+    token, _ = register("log@example.com")
+    with caplog.at_level(logging.INFO, logger="aura.requests"):
+        client.get("/api/pings/42", headers=auth_header(token))
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["route"] == "/api/pings/{ping_id}"
+    assert record["status"] == 404
+    assert record["queries"] >= 1
+    assert "slowest_sql" in record
+
+
+def test_list_endpoints_do_not_grow_with_rows(
+    client, assert_max_queries, auth_header, register, befriend, create_aura
+):
+    owner = token1, id1 = register("owner@example.com")
+    guests = [register(f"guest{i}@example.com") for i in range(3)]
+    for guest in guests:
+        befriend(owner, guest)
+    guest_ids = [uid for _, uid in guests]
+
+    created = [create_aura(token1, guest_ids)]
+    one = client.get("/api/pings/inbox", headers=auth_header(token1))
+    created += [create_aura(token1, guest_ids) for _ in range(4)]
+    assert all(r.status_code == 201 for r in created)
+    aura_ids = [r.json()["id"] for r in created]
+    many = client.get("/api/pings/inbox", headers=auth_header(token1))
+    assert len(many.json()) == 5
+    assert many.headers["x-query-count"] == one.headers["x-query-count"]
+
+    assert_max_queries(many, 3)
+    assert_max_queries(client.get("/api/friends", headers=auth_header(token1)), 1)
+    assert_max_queries(
+        client.get("/api/pings/changes", headers=auth_header(guests[0][0])), 4
+    )
+    r = client.post(
+        "/api/pings/respond:batch",
+        headers=auth_header(guests[0][0]),
+        json={"items": [{"ping_id": i, "status": "accepted"} for i in aura_ids]},
+    )
+    assert r.status_code == 200
+    assert_max_queries(r, 5)  # 4 + re-arming the reminders
+
+
+def test_friend_request_and_approve_budget(
+    client, assert_max_queries, auth_header, register
+):
+    token1, id1 = register("a@example.com")
+    token2, id2 = register("b@example.com")
+    r = client.post(f"/api/friends/{id2}/request", headers=auth_header(token1))
+    assert_max_queries(r, 2)
+    r = client.post(f"/api/friends/{id1}/approve", headers=auth_header(token2))
+    assert_max_queries(r, 2)
@@ -0,0 +1,135 @@
+# backend/tests/test_reminders.py
+from datetime import datetime, timedelta
+
+from app import models, reminders
+from app.db import SessionLocal
+from app.reminders import REMINDER_LEAD, Status, deliver_due
+
+STARTS_AT = datetime(2030, 1, 1, 15, 0)
+
+
+def jobs() -> dict:
+    with SessionLocal() as db:
+        return {(j.user_id, j.ping_id): j for j in db.query(models.ReminderJob)}
+
+
+def add_auras(starts: list) -> tuple:
+    """One user with an aura per start time; returns (user_id, ping ids)."""
+    with SessionLocal() as db:
+        u = models.User(email="rem@example.com", name="r", password_hash="x")
+        db.add(u)
+        db.flush()
+        pings = [
+            models.Ping(creator_id=u.id, title=f"A{i}", starts_at=s, location="Bar")
+            for i, s in enumerate(starts)
+        ]
+        db.add_all(pings)
+        db.flush()
+        reminders.schedule(
+            db, [(p.id, p.starts_at, u.id) for p in pings], now=datetime(2029, 1, 1)
+        )
+        db.commit()
+        return u.id, [p.id for p in pings]
+
+
+class Recorder:
+    def __init__(self, fail: int = 0):
+        self.calls = []
+        self.fail = fail
+
+    def send(self, user_id, items):
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("push service down")
+        self.calls.append((user_id, [r.ping_id for r in items]))
+
+
+def test_rsvp_cancels_and_rearms_reminders(
+    client, auth_header, register, befriend, create_aura
+):
+    token1, id1 = register("host@example.com")
+    token2, id2 = register("guest@example.com")
+    befriend((token1, id1), (token2, id2))
+    ping_id = create_aura(token1, [id2]).json()["id"]
+
+    queued = jobs()
+    assert set(queued) == {(id1, ping_id), (id2, ping_id)}
+    assert queued[(id2, ping_id)].run_at == STARTS_AT - REMINDER_LEAD
+    assert queued[(id2, ping_id)].status == Status.pending
+
+    def respond(status):
+        r = client.post(
+            f"/api/pings/{ping_id}/respond",
+            headers=auth_header(token2),
+            json={"status": status},
+        )
+        assert r.status_code == 200
+        return jobs()[(id2, ping_id)].status
+
+    assert respond("declined") == Status.cancelled
+    assert respond("accepted") == Status.pending
+    assert jobs()[(id1, ping_id)].status == Status.pending
+
+
+def test_reminders_are_coalesced_per_user():
+    user_id, (a, b, c) = add_auras(
+        [STARTS_AT, STARTS_AT + timedelta(minutes=2), STARTS_AT + timedelta(days=1)]
+    )
+    sender = Recorder()
+    now = STARTS_AT - REMINDER_LEAD
+    with SessionLocal() as db:
+        # b is not due yet but within the coalescing window: same message
+        assert deliver_due(db, now=now, send=sender) == 2
+        assert deliver_due(db, now=now, send=sender) == 0
+    assert sender.calls == [(user_id, [a, b])]
+    assert {k[1]: j.status for k, j in jobs().items()} == {
+        a: Status.sent,
+        b: Status.sent,
+        c: Status.pending,
+    }
+
+
+def test_failed_sends_back_off_then_give_up(monkeypatch):
+    monkeypatch.setattr(reminders, "REMINDER_MAX_ATTEMPTS", 2)
+    user_id, (a,) = add_auras([STARTS_AT])
+    sender = Recorder(fail=2)
+    now = STARTS_AT - REMINDER_LEAD
+    with SessionLocal() as db:
+        deliver_due(db, now=now, send=sender)
+        job = jobs()[(user_id, a)]
+        assert (job.status, job.attempts) == (Status.pending, 1)
+        assert job.run_at == now + timedelta(seconds=reminders.REMINDER_BACKOFF_SECONDS)
+        assert "push service down" in job.last_error
+
+        # not due again before the backoff has passed
+        assert deliver_due(db, now=now, send=sender) == 0
+        deliver_due(db, now=job.run_at, send=sender)
+    job = jobs()[(user_id, a)]
+    assert (job.status, job.attempts) == (Status.failed, 2)
+    assert sender.calls == []
+
+
+def test_stale_and_abandoned_jobs():
+    user_id, (a, b) = add_auras([STARTS_AT, STARTS_AT])
+    now = STARTS_AT - REMINDER_LEAD
+    with SessionLocal() as db:
+        db.query(models.Ping).filter_by(id=a).update(
+            {models.Ping.status: models.AuraStatus.closed}
+        )
+        # b was claimed by a worker that died mid-send
+        db.query(models.ReminderJob).filter_by(ping_id=b).update(
+            {
+                models.ReminderJob.status: Status.sending,
+                models.ReminderJob.locked_by: "dead-worker",
+                models.ReminderJob.locked_until: now - timedelta(seconds=1),
+                models.ReminderJob.attempts: 1,
+            }
+        )
+        db.commit()
+
+        sender = Recorder()
+        assert deliver_due(db, now=now, send=sender) == 2
+    assert sender.calls == [(user_id, [b])]
+    assert jobs()[(user_id, a)].status == Status.cancelled
+    job = jobs()[(user_id, b)]
+    assert (job.status, job.attempts, job.locked_by) == (Status.sent, 2, None)
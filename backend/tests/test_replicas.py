@@ -0,0 +1,104 @@
+# backend/tests/test_replicas.py
+import sqlite3
+import time
+
+import pytest
+from jose import jwt
+from sqlalchemy import create_engine
+
+from app import auth, db, models
+from app.db import Base
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """A second SQLite file acting as an (unreplicated) read replica."""
+    path = tmp_path / "replica.sqlite3"
+    sync_replica = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_replica)
+    monkeypatch.setattr(db.RoutingSession, "replicas", [sync_replica])
+    if db.DB_ASYNC:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        async_replica = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        monkeypatch.setattr(
+            db.AsyncRoutingSession, "replicas", [async_replica.sync_engine]
+        )
+    yield path
+    sync_replica.dispose()
+
+
+def replicate(replica_path) -> None:
+    src = sqlite3.connect(db.engine.url.database)
+    dst = sqlite3.connect(replica_path)
+    src.backup(dst)
+    src.close()
+    dst.close()
+
+
+def old_token(user_id: int) -> str:
+    """A valid token issued an hour ago, so it does not pin reads itself."""
+    now = int(time.time())
+    claims = {"sub": str(user_id), "iat": now - 3600, "exp": now + 3600}
+    return jwt.encode(claims, auth.SECRET_KEY, algorithm=auth.ALGORITHM)
+
+
+def test_reads_go_to_replica_except_right_after_a_write(
+    client, replica, monkeypatch, auth_header, register
+):
+    token, _ = register("user1@example.com")
+
+    # Just registered: the fresh token keeps reads on the primary, even
+    # without the write cookie (another worker, another client)
+    client.cookies.clear()
+    assert client.get("/api/friends", headers=auth_header(token)).status_code == 200
+
+    # Sticky window over: the replica hasn't seen the user yet
+    monkeypatch.setattr(db, "REPLICA_STICKY_SECONDS", 0)
+    auth.user_cache.clear()
+    assert client.get("/api/friends", headers=auth_header(token)).status_code == 401
+
+    # Once replicated, the replica serves it
+    replicate(replica)
+    assert client.get("/api/friends", headers=auth_header(token)).status_code == 200
+
+
+def test_last_write_time_travels_with_the_client(
+    client, replica, auth_header, create_aura
+):
+    with db.SessionLocal() as s:
+        users = [
+            models.User(email=f"u{i}@example.com", name=f"u{i}", password_hash="x")
+            for i in (1, 2)
+        ]
+        s.add_all(users)
+        s.flush()
+        me, friend = (u.id for u in users)
+        s.add(
+            models.Friendship(
+                low_id=min(me, friend),
+                high_id=max(me, friend),
+                status=models.FriendshipStatus.accepted,
+            )
+        )
+        s.commit()
+    replicate(replica)
+    token = old_token(me)
+    headers = auth_header(token)
+    assert client.get("/api/pings/inbox", headers=headers).json() == []
+    assert "x-last-write" not in client.get("/api/me", headers=headers).headers
+
+    r = create_aura(token, [friend])
+    assert r.status_code == 201
+    stamp = r.headers["x-last-write"]
+    assert abs(float(stamp) - time.time()) < 5
+    assert "aura_wrote=" in r.headers["set-cookie"]
+
+    # the cookie keeps this client on the primary...
+    assert len(client.get("/api/pings/inbox", headers=headers).json()) == 1
+    # ...a client without it reads the lagging replica...
+    client.cookies.clear()
+    assert client.get("/api/pings/inbox", headers=headers).json() == []
+    # ...unless it echoes the header back
+    r = client.get("/api/pings/inbox", headers={**headers, "X-Last-Write": stamp})
+    assert len(r.json()) == 1
@@ -0,0 +1,124 @@
+# backend/tests/test_scheduler.py
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app import models
+from app.db import SessionLocal
+from app.jobs import AURA_CLOSE_GRACE, close_past_auras
+from app.main import app
+from app.scheduler import Scheduler, scheduler
+
+STAMP = datetime(2020, 1, 1)
+
+
+def add_user_and_auras(starts: list) -> list:
+    with SessionLocal() as db:
+        u = models.User(email="sched@example.com", name="s", password_hash="x")
+        db.add(u)
+        db.flush()
+        pings = [
+            models.Ping(creator_id=u.id, starts_at=s, location="Here", updated_at=STAMP)
+            for s in starts
+        ]
+        db.add_all(pings)
+        db.commit()
+        return [p.id for p in pings]
+
+
+def statuses() -> dict:
+    with SessionLocal() as db:
+        return {p.id: p.status for p in db.query(models.Ping)}
+
+
+def change_marks() -> set:
+    with SessionLocal() as db:
+        return {(p.updated_at, p.version) for p in db.query(models.Ping)}
+
+
+def test_close_past_auras_in_batches():
+    now = datetime(2030, 6, 1, 12, 0)
+    old = now - AURA_CLOSE_GRACE - timedelta(minutes=1)
+    ids = add_user_and_auras(
+        [old - timedelta(hours=i) for i in range(5)]
+        + [now - AURA_CLOSE_GRACE + timedelta(minutes=1), now + timedelta(days=1)]
+    )
+    with SessionLocal() as db:
+        assert close_past_auras(db, now=now, batch_size=2, max_batches=2) == 4
+        assert close_past_auras(db, now=now, batch_size=2) == 1
+        assert close_past_auras(db, now=now) == 0
+
+    closed = models.AuraStatus.closed
+    assert [statuses()[i] for i in ids] == [closed] * 5 + [models.AuraStatus.open] * 2
+    # closing is not a change clients have to sync (/pings/changes, ICS)
+    assert change_marks() == {(STAMP, 1)}
+
+
+def test_only_the_lease_holder_runs_jobs():
+    ran = []
+    a, b = Scheduler(lease_seconds=60), Scheduler(lease_seconds=60)
+    for s in (a, b):
+        s.add_job("probe", 3600, lambda db, s=s: ran.append(s) or 1)
+
+    assert a.run_due() == {"probe": 1}
+    assert b.run_due() == {}
+    # interval not passed yet
+    assert a.run_due() == {}
+    assert a.run_due(force=True) == {"probe": 1}
+
+    # leader goes away without releasing: b takes over once the lease expires
+    with SessionLocal() as db:
+        db.query(models.JobLease).update(
+            {models.JobLease.expires_at: datetime.utcnow() - timedelta(seconds=1)}
+        )
+        db.commit()
+    assert b.run_due() == {"probe": 1}
+    assert a.run_due() == {}
+    assert ran == [a, a, b]
+
+    with SessionLocal() as db:
+        b.release_lease(db)
+    assert a.run_due(force=True) == {"probe": 1}
+
+
+def test_failing_job_does_not_stop_the_others():
+    s = Scheduler()
+    s.add_job("broken", 60, lambda db: 1 / 0)
+    s.add_job("fine", 60, lambda db: 3)
+    assert s.run_due() == {"fine": 3}
+
+
+def test_lifespan_starts_and_stops_scheduler():
+    with TestClient(app):
+        assert scheduler._task is not None
+    assert scheduler._task is None
+
+
+def test_upcoming_inbox_skips_closed_auras(client):
+    r = client.post(
+        "/api/auth/register",
+        json={"email": "up@example.com", "name": "up", "password": "secret"},
+    )
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    with SessionLocal() as db:
+        me = db.query(models.User).one()
+        db.add_all(
+            [
+                models.Ping(
+                    creator_id=me.id,
+                    starts_at=datetime.utcnow() + timedelta(days=1),
+                    location="Open",
+                ),
+                models.Ping(
+                    creator_id=me.id,
+                    starts_at=datetime.utcnow() + timedelta(days=2),
+                    location="Closed",
+                    status=models.AuraStatus.closed,
+                ),
+            ]
+        )
+        db.commit()
+    upcoming = client.get("/api/pings/inbox?window=upcoming", headers=headers).json()
+    assert [p["location"] for p in upcoming] == ["Open"]
+    everything = client.get("/api/pings/inbox", headers=headers).json()
+    assert len(everything) == 2
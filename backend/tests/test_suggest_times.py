@@ -0,0 +1,209 @@
+# backend/tests/test_suggest_times.py
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import models
+from app.auth import make_token
+from app.availability import best_slots, candidate_grid, night_intervals, sweep
+from app.db import SessionLocal
+
+MONDAY = datetime(2030, 1, 7)  # winter: Stockholm is UTC+1, New York UTC-5
+
+
+def add_users(n: int, timezones=None) -> list:
+    """Creator plus n accepted friends; returns [(token, id)], creator first."""
+    timezones = timezones or {}
+    with SessionLocal() as db:
+        users = [
+            models.User(
+                email=f"st{i}@example.com",
+                name=f"st{i}",
+                password_hash="x",
+                timezone=timezones.get(i, "Europe/Stockholm"),
+            )
+            for i in range(n + 1)
+        ]
+        db.add_all(users)
+        db.flush()
+        me = users[0].id
+        for u in users[1:]:
+            low, high = models.Friendship.pair(me, u.id)
+            db.add(
+                models.Friendship(
+                    low_id=low,
+                    high_id=high,
+                    requester_id=me,
+                    status=models.FriendshipStatus.accepted,
+                )
+            )
+        db.commit()
+        return [(make_token(u.id), u.id) for u in users]
+
+
+@pytest.fixture
+def suggest(client, auth_header):
+    """suggest(token, invitee_ids, **fields) -> the suggest-times response."""
+
+    def post(token: str, invitee_ids: list, **extra):
+        body = {
+            "invitee_ids": invitee_ids,
+            "window_start": MONDAY.isoformat() + "Z",
+            "window_end": (MONDAY + timedelta(days=1)).isoformat() + "Z",
+            **extra,
+        }
+        return client.post(
+            "/api/pings/suggest-times", headers=auth_header(token), json=body
+        )
+
+    return post
+
+
+def test_sweep_matches_brute_force():
+    rng = random.Random(3)
+    duration, step = timedelta(minutes=90), timedelta(minutes=15)
+    grid = candidate_grid(MONDAY, MONDAY + timedelta(days=2), duration, step)
+    blocked = {}
+    for uid in range(12):
+        blocked[uid] = []
+        for _ in range(rng.randint(0, 6)):
+            b0 = MONDAY + timedelta(minutes=rng.randrange(0, 2 * 24 * 60, 5))
+            blocked[uid].append((b0, b0 + timedelta(minutes=rng.randint(5, 300))))
+
+    expected = [
+        frozenset(
+            uid
+            for uid, intervals in blocked.items()
+            if any(b0 < s + duration and s < b1 for b0, b1 in intervals)
+        )
+        for s in grid
+    ]
+    assert sweep(blocked, grid, duration) == expected
+
+    slots = best_slots(grid, expected, duration, limit=5)
+    assert len(slots) == 5
+    starts = sorted(s.starts_at for s in slots)
+    assert all(b - a >= duration for a, b in zip(starts, starts[1:]))
+    assert len(slots[0].busy_ids) == min(len(b) for b in expected)
+
+
+def test_candidate_grid_rounds_up_to_the_step():
+    start = MONDAY + timedelta(minutes=7)
+    grid = candidate_grid(
+        start, MONDAY + timedelta(hours=3), timedelta(hours=2), timedelta(minutes=30)
+    )
+    assert grid == [MONDAY + timedelta(minutes=m) for m in (30, 60)]
+
+
+def test_nights_follow_each_users_timezone():
+    nights = night_intervals(
+        "Europe/Stockholm", MONDAY, MONDAY + timedelta(hours=1), 8, 23
+    )
+    # Sunday 23:00 -> Monday 08:00 local time
+    assert (MONDAY - timedelta(hours=2), MONDAY + timedelta(hours=7)) in nights
+    nights = night_intervals(
+        "America/New_York", MONDAY, MONDAY + timedelta(hours=1), 8, 23
+    )
+    assert (MONDAY + timedelta(hours=4), MONDAY + timedelta(hours=13)) in nights
+    # unknown zones count as UTC
+    assert (
+        MONDAY - timedelta(hours=1),
+        MONDAY + timedelta(hours=8),
+    ) in night_intervals("Mars/Olympus", MONDAY, MONDAY + timedelta(hours=1), 8, 23)
+
+
+def test_suggest_times_avoids_auras_and_nights(suggest):
+    (token, me), (_, busy_id), (_, ny_id) = add_users(
+        2, timezones={2: "America/New_York"}
+    )
+    with SessionLocal() as db:
+        # busy_id has accepted an aura on Monday 08:00-10:00 UTC
+        other = models.Ping(
+            creator_id=ny_id,
+            title="Gym",
+            starts_at=MONDAY + timedelta(hours=8),
+            location="Gym",
+        )
+        db.add(other)
+        db.flush()
+        db.add(
+            models.PingInvite(
+                ping_id=other.id,
+                invitee_id=busy_id,
+                status=models.InviteStatus.accepted,
+            )
+        )
+        db.commit()
+
+    r = suggest(token, [busy_id, ny_id], duration_minutes=60, limit=3)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["participants"] == 3
+    best = body["slots"][0]
+    # everybody is free from 13:00 UTC (08:00 in New York), the aura is over
+    assert best["starts_at"] == "2030-01-07T13:00:00Z"
+    assert best["ends_at"] == "2030-01-07T14:00:00Z"
+    assert sorted(best["available_ids"]) == sorted([me, busy_id, ny_id])
+    assert best["busy_ids"] == []
+    assert len(body["slots"]) == 3
+
+
+def test_suggest_times_validation(suggest):
+    (token, me), (_, friend_id) = add_users(1)
+    with SessionLocal() as db:
+        db.add(models.User(email="x@example.com", name="x", password_hash="x"))
+        db.commit()
+        stranger = db.query(models.User).filter_by(email="x@example.com").one().id
+
+    assert suggest(token, [stranger]).status_code == 400
+    assert suggest(token, [me]).status_code == 400
+    r = suggest(
+        token,
+        [friend_id],
+        window_end=(MONDAY + timedelta(days=30)).isoformat() + "Z",
+    )
+    assert r.status_code == 400
+    r = suggest(
+        token,
+        [friend_id],
+        window_end=(MONDAY - timedelta(days=1)).isoformat() + "Z",
+    )
+    assert r.status_code == 422
+    # a naive start against an aware end is compared in UTC, not a 500
+    r = suggest(
+        token,
+        [friend_id],
+        window_start=MONDAY.isoformat(),
+        window_end=(MONDAY - timedelta(days=1)).isoformat() + "Z",
+    )
+    assert r.status_code == 422
+    r = suggest(token, [friend_id], window_start=MONDAY.isoformat())
+    assert r.status_code == 200
+
+
+def test_fifty_invitees_over_two_weeks(suggest, assert_max_queries):
+    users = add_users(50)
+    token, ids = users[0][0], [uid for _, uid in users[1:]]
+    with SessionLocal() as db:
+        for k, uid in enumerate(ids):
+            db.add(
+                models.Ping(
+                    creator_id=uid,
+                    title="Busy",
+                    starts_at=MONDAY + timedelta(hours=9 + k % 10, days=k % 14),
+                    location="Here",
+                )
+            )
+        db.commit()
+
+    r = suggest(
+        token,
+        ids,
+        window_end=(MONDAY + timedelta(days=14)).isoformat() + "Z",
+        step_minutes=15,
+    )
+    assert r.status_code == 200
+    slots = r.json()["slots"]
+    assert len(slots) == 5 and all(s["busy_ids"] == [] for s in slots)
+    assert_max_queries(r, 4)
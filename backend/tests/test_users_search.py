@@ -0,0 +1,40 @@
+# backend/tests/test_users_search.py
+import pytest
+
+
+@pytest.fixture
+def search(client, auth_header):
+    def names(token: str, q: str) -> list:
+        r = client.get("/api/users/search", params={"q": q}, headers=auth_header(token))
+        assert r.status_code == 200
+        return [u["name"] for u in r.json()]
+
+    return names
+
+
+def test_search_matches_word_prefixes(register, search):
+    me = register("me@example.com", "Me Myself")
+    register("anna.svensson@example.com", "Anna Svensson")
+    register("bob@example.com", "Bob Andersson")
+
+    assert search(me[0], "ann") == ["Anna Svensson"]
+    assert search(me[0], "and") == ["Bob Andersson"]
+    assert search(me[0], "anna sv") == ["Anna Svensson"]
+    assert search(me[0], "bob@exa") == ["Bob Andersson"]
+    assert search(me[0], "myself") == []  # never yourself
+    assert search(me[0], "%") == []
+
+
+def test_search_ranks_friends_then_friends_of_friends(register, befriend, search):
+    me = register("me@example.com", "Me")
+    register("sam.a@example.com", "Sam Stranger")
+    fof = register("sam.b@example.com", "Sam Friendly")
+    friend = register("sam.c@example.com", "Sam Close")
+    befriend(me, friend)
+    befriend(friend, fof)
+
+    assert search(me[0], "sam") == [
+        "Sam Close",
+        "Sam Friendly",
+        "Sam Stranger",
+    ]